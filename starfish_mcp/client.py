@@ -2,8 +2,10 @@
 
 import asyncio
 import ssl
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlencode
 import aiohttp
 import structlog
@@ -16,6 +18,41 @@ from .config import StarfishConfig
 
 logger = structlog.get_logger(__name__)
 
+# Fields requested when the caller gives no format. Limited to what the
+# starfish_query tool renders, since every extra column costs wire bytes
+# and parse time per entry.
+DEFAULT_QUERY_FORMAT = "parent_path fn type size ct mt at uid gid mode volume tags_explicit tags_inherited"
+
+# Most distinct query results kept by the query cache; least recently used
+# results are evicted first
+QUERY_CACHE_MAX_ENTRIES = 64
+
+
+def _create_session() -> aiohttp.ClientSession:
+    """Create the HTTP session shared by every request of its owner.
+    
+    The session is meant to live as long as its owner so that keep-alive
+    connections, and their TLS handshakes, are reused across requests.
+    """
+    # Create SSL context that accepts self-signed certificates. Nothing is
+    # verified, so skip create_default_context(): loading the system CA store
+    # takes tens of milliseconds per session and would never be consulted.
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    
+    # The pool keeps aiohttp's default limits (100 in total, none per host).
+    # aiohttp has no separate cap on idle connections, so the
+    # max_idle_connections settings have nothing to map to. Using them as
+    # limit/limit_per_host would cap active requests to the single Starfish
+    # host and queue the batch, fan-out and prefetch concurrency behind it.
+    connector = aiohttp.TCPConnector(ssl=ssl_context)
+    timeout = aiohttp.ClientTimeout(total=30)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout
+    )
+
 
 class TokenManager:
     """Manages bearer token authentication and refresh."""
@@ -29,17 +66,7 @@ class TokenManager:
     async def _ensure_session(self) -> None:
         """Ensure we have an active session."""
         if self.session is None or self.session.closed:
-            # Create SSL context that accepts self-signed certificates
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout
-            )
+            self.session = _create_session()
     
     async def get_token(self) -> str:
         """Get a valid bearer token, refreshing if necessary."""
@@ -158,6 +185,12 @@ class StarfishClient:
         self.config = config
         self.token_manager = TokenManager(config)
         self.session: Optional[aiohttp.ClientSession] = None
+        # listing name -> (monotonic fetch time, result)
+        self._listing_cache: Dict[str, Tuple[float, List[Any]]] = {}
+        # query parameters -> (monotonic fetch time, entries), in LRU order
+        self._query_cache: OrderedDict[Tuple[Any, ...], Tuple[float, List[StarfishEntry]]] = OrderedDict()
+        # query parameters -> [request task, callers waiting on it]
+        self._inflight_queries: Dict[Tuple[Any, ...], List[Any]] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -171,17 +204,97 @@ class StarfishClient:
     async def _ensure_session(self) -> None:
         """Ensure we have an active session."""
         if self.session is None or self.session.closed:
-            # Create SSL context that accepts self-signed certificates
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout
-            )
+            self.session = _create_session()
+    
+    def _get_cached_listing(self, key: str) -> Optional[List[Any]]:
+        """Return a cached listing if it is younger than the configured TTL."""
+        cached = self._listing_cache.get(key)
+        if cached is None:
+            return None
+        
+        fetched_at, value = cached
+        if time.monotonic() - fetched_at >= self.config.list_cache_ttl_seconds:
+            del self._listing_cache[key]
+            return None
+        
+        logger.debug("Using cached listing", listing=key)
+        return list(value)
+    
+    def _cache_listing(self, key: str, value: List[Any]) -> None:
+        """Cache a listing result (no-op when the TTL is 0)."""
+        if self.config.list_cache_ttl_seconds > 0:
+            self._listing_cache[key] = (time.monotonic(), list(value))
+    
+    def _get_cached_query(self, key: Tuple[Any, ...]) -> Optional[List[StarfishEntry]]:
+        """Return cached query entries if they are younger than the configured TTL."""
+        cached = self._query_cache.get(key)
+        if cached is None:
+            return None
+        
+        fetched_at, entries = cached
+        if time.monotonic() - fetched_at >= self.config.query_cache_ttl_seconds:
+            del self._query_cache[key]
+            return None
+        
+        self._query_cache.move_to_end(key)
+        logger.debug("Using cached query result", total_entries=len(entries))
+        return list(entries)
+    
+    def _cache_query(self, key: Tuple[Any, ...], entries: List[StarfishEntry]) -> None:
+        """Cache query entries (no-op when the TTL is 0), evicting the oldest."""
+        if self.config.query_cache_ttl_seconds <= 0:
+            return
+        self._query_cache[key] = (time.monotonic(), list(entries))
+        self._query_cache.move_to_end(key)
+        while len(self._query_cache) > QUERY_CACHE_MAX_ENTRIES:
+            self._query_cache.popitem(last=False)
+    
+    async def _run_query_once(self, key: Tuple[Any, ...],
+                              fetch: Callable[[], Awaitable[List[StarfishEntry]]],
+                              use_cache: bool) -> List[StarfishEntry]:
+        """Return entries for key from the cache, a shared request, or fetch().
+        
+        Identical queries that arrive while one is still running wait for
+        that request instead of sending their own. With use_cache False the
+        query is always sent, but its result still refreshes the cache.
+        """
+        if not use_cache:
+            entries = await fetch()
+            self._cache_query(key, entries)
+            return entries
+        
+        cached = self._get_cached_query(key)
+        if cached is not None:
+            return cached
+        
+        async def fetch_and_cache() -> List[StarfishEntry]:
+            entries = await fetch()
+            self._cache_query(key, entries)
+            return entries
+        
+        inflight = self._inflight_queries.get(key)
+        if inflight is None:
+            inflight = [asyncio.ensure_future(fetch_and_cache()), 0]
+            self._inflight_queries[key] = inflight
+        else:
+            logger.debug("Joining in-flight query", waiters=inflight[1])
+        task = inflight[0]
+        inflight[1] += 1
+        try:
+            # Shielded so one caller being cancelled doesn't fail the others
+            return list(await asyncio.shield(task))
+        finally:
+            inflight[1] -= 1
+            if inflight[1] == 0:
+                if self._inflight_queries.get(key) is inflight:
+                    del self._inflight_queries[key]
+                # No-op once finished; otherwise nobody is left to use it
+                task.cancel()
+    
+    def clear_cache(self) -> None:
+        """Drop all cached listings and query results."""
+        self._listing_cache.clear()
+        self._query_cache.clear()
     
     async def _request(self, method: str, endpoint: str, 
                       params: Optional[Dict[str, Any]] = None,
@@ -278,11 +391,13 @@ class StarfishClient:
                 details={"error": str(e)}
             )
     
-    async def async_query(self, volumes_and_paths: List[str] = None,
-                         queries: List[str] = None, format_fields: str = None,
-                         limit: int = None, sort_by: str = None,
+    async def async_query(self, volumes_and_paths: Optional[List[str]] = None,
+                         queries: Optional[List[str]] = None,
+                         format_fields: Optional[str] = None,
+                         limit: Optional[int] = None, sort_by: Optional[str] = None,
                          async_after_sec: float = 5.0,
-                         timeout: int = 300) -> List[StarfishEntry]:
+                         timeout: int = 300,
+                         use_cache: bool = True) -> List[StarfishEntry]:
         """Execute async query against Starfish API (more powerful endpoint).
         
         Args:
@@ -293,16 +408,35 @@ class StarfishClient:
             sort_by: Sort specification
             async_after_sec: Seconds to wait before going async (5.0 recommended)
             timeout: Maximum time to wait for results
+            use_cache: Reuse a recent identical result if one is cached
         """
+        cache_key = (
+            "async_query", tuple(volumes_and_paths or ()), tuple(queries or ()),
+            format_fields or DEFAULT_QUERY_FORMAT, limit, sort_by
+        )
+        return await self._run_query_once(
+            cache_key,
+            lambda: self._submit_async_query(
+                volumes_and_paths, queries, format_fields, limit, sort_by,
+                async_after_sec, timeout
+            ),
+            use_cache
+        )
+    
+    async def _submit_async_query(self, volumes_and_paths: Optional[List[str]],
+                                  queries: Optional[List[str]], format_fields: Optional[str],
+                                  limit: Optional[int], sort_by: Optional[str],
+                                  async_after_sec: float, timeout: int) -> List[StarfishEntry]:
+        """Submit an async query and poll until its results are available."""
         
         # Build request body for async query based on official API docs
         body = {
             "volumes_and_paths": volumes_and_paths or [],
             "queries": queries or [],  # Empty list means get all entries
-            "format": format_fields or "parent_path fn type size blck ct mt at uid gid mode tags_explicit tags_inherited volume",
+            "format": format_fields or DEFAULT_QUERY_FORMAT,
             "async_after_sec": async_after_sec,
             "output_format": "json",
-            "pretty_json": True,
+            "pretty_json": False,
             "force_tag_inherit": False,
             "without_private_tags": True
         }
@@ -414,17 +548,20 @@ class StarfishClient:
                 details={"error": str(e)}
             )
 
-    async def query(self, query: str, format_fields: str = None, 
-                   limit: int = 1000, sort_by: str = None, 
-                   volumes_and_paths: str = None) -> List[StarfishEntry]:
-        """Execute query against Starfish API."""
+    async def query(self, query: str, format_fields: Optional[str] = None, 
+                   limit: int = 1000, sort_by: Optional[str] = None, 
+                   volumes_and_paths: Optional[str] = None,
+                   use_cache: bool = True) -> List[StarfishEntry]:
+        """Execute query against Starfish API.
+        
+        A recent identical result, or an identical request already in flight,
+        is reused unless use_cache is False.
+        """
         params = {"query": query}
         
-        if format_fields:
-            params["format"] = format_fields
-        else:
-            # Default format with all useful fields
-            params["format"] = "parent_path fn type size ct mt at uid gid mode volume tags_explicit tags_inherited"
+        params["format"] = format_fields or DEFAULT_QUERY_FORMAT
+        
+        cache_key = ("query", query, volumes_and_paths, params["format"], limit, sort_by)
         
         if limit:
             params["limit"] = str(limit)
@@ -435,11 +572,19 @@ class StarfishClient:
         if volumes_and_paths:
             params["volumes_and_paths"] = volumes_and_paths
         
+        return await self._run_query_once(
+            cache_key, lambda: self._submit_query(params), use_cache
+        )
+    
+    async def _submit_query(self, params: Dict[str, str]) -> List[StarfishEntry]:
+        """Send a /query/ request and parse its entries."""
+        query = params["query"]
+        
         logger.info(
             "Executing Starfish query",
             query=query,
-            limit=limit,
-            format_fields=format_fields
+            limit=params.get("limit"),
+            format_fields=params["format"]
         )
         
         try:
@@ -480,6 +625,10 @@ class StarfishClient:
         """List all available volumes."""
         logger.info("Listing Starfish volumes")
         
+        cached = self._get_cached_listing("volumes")
+        if cached is not None:
+            return cached
+        
         try:
             volumes_data = await self._request("GET", "/volume/")
             
@@ -496,6 +645,7 @@ class StarfishClient:
                 total_volumes=len(volumes)
             )
             
+            self._cache_listing("volumes", volumes)
             return volumes
             
         except StarfishError:
@@ -564,6 +714,10 @@ class StarfishClient:
         """List all available tagsets."""
         logger.info("Listing tagsets")
         
+        cached = self._get_cached_listing("tagsets")
+        if cached is not None:
+            return cached
+        
         try:
             # Call /tagset/ endpoint without ID to get all tagsets
             tagsets_data = await self._request("GET", "/tagset/")
@@ -573,7 +727,9 @@ class StarfishClient:
                 total_tagsets=len(tagsets_data) if isinstance(tagsets_data, list) else 0
             )
             
-            return tagsets_data if isinstance(tagsets_data, list) else []
+            tagsets: List[Dict[str, Any]] = tagsets_data if isinstance(tagsets_data, list) else []
+            self._cache_listing("tagsets", tagsets)
+            return tagsets
             
         except StarfishError:
             raise
@@ -689,6 +845,11 @@ class StarfishClient:
     async def list_zones(self) -> List[StarfishZoneDetails]:
         """List all available zones."""
         logger.info("Listing Starfish zones")
+        
+        cached = self._get_cached_listing("zones")
+        if cached is not None:
+            return cached
+        
         try:
             zones_data = await self._request("GET", "/zone/")
             if not isinstance(zones_data, list):
@@ -701,6 +862,7 @@ class StarfishClient:
                 "Zones listed successfully",
                 total_zones=len(zones)
             )
+            self._cache_listing("zones", zones)
             return zones
         except StarfishError:
             raise
@@ -22,6 +22,12 @@ class StarfishConfig(BaseModel):
     collections_refresh_interval_minutes: int = Field(
         10, description="Collections refresh interval in minutes"
     )
+    list_cache_ttl_seconds: int = Field(
+        30, description="How long volume/zone/tagset listings are cached in seconds (0 disables)"
+    )
+    query_cache_ttl_seconds: int = Field(
+        0, description="How long identical query results are reused in seconds (0 disables)"
+    )
     
     # HTTP Client Configuration
     http_timeout_seconds: int = Field(30, description="HTTP request timeout in seconds")
@@ -79,6 +85,22 @@ class StarfishConfig(BaseModel):
             raise ValueError("Token timeout must be non-negative")
         return v
     
+    @field_validator("list_cache_ttl_seconds")
+    @classmethod
+    def validate_list_cache_ttl(cls, v: int) -> int:
+        """Validate listing cache TTL."""
+        if v < 0:
+            raise ValueError("List cache TTL must be non-negative")
+        return v
+    
+    @field_validator("query_cache_ttl_seconds")
+    @classmethod
+    def validate_query_cache_ttl(cls, v: int) -> int:
+        """Validate query cache TTL."""
+        if v < 0:
+            raise ValueError("Query cache TTL must be non-negative")
+        return v
+    
     @field_validator("tls_min_version")
     @classmethod
     def validate_tls_version(cls, v: str) -> str:
@@ -123,6 +145,8 @@ def load_config(env_file: Optional[str] = None) -> StarfishConfig:
         "collections_refresh_interval_minutes": int(
             os.getenv("COLLECTIONS_REFRESH_INTERVAL_MINUTES", "10")
         ),
+        "list_cache_ttl_seconds": int(os.getenv("LIST_CACHE_TTL_SECONDS", "30")),
+        "query_cache_ttl_seconds": int(os.getenv("QUERY_CACHE_TTL_SECONDS", "0")),
         "http_timeout_seconds": int(os.getenv("HTTP_TIMEOUT_SECONDS", "30")),
         "max_idle_connections": int(os.getenv("MAX_IDLE_CONNECTIONS", "100")),
         "max_idle_connections_per_host": int(
@@ -31,6 +31,17 @@ class RateLimiter:
             enabled=enabled
         )
     
+    def _prune(self, now: float) -> None:
+        """Drop timestamps that have fallen out of the time window.
+        
+        Timestamps are appended in order, so expired ones are always at the
+        left of the deque and each one is popped at most once.
+        """
+        timestamps = self._query_timestamps
+        cutoff = now - self.time_window_seconds
+        while timestamps and timestamps[0] < cutoff:
+            timestamps.popleft()
+    
     def check_rate_limit(self) -> tuple[bool, Optional[str]]:
         """Check if a new query is allowed under the rate limit.
         
@@ -41,11 +52,8 @@ class RateLimiter:
         if not self.enabled:
             return True, None
             
-        now = time.time()
-        
-        # Clean up old timestamps outside the time window
-        while self._query_timestamps and now - self._query_timestamps[0] > self.time_window_seconds:
-            self._query_timestamps.popleft()
+        now = time.monotonic()
+        self._prune(now)
         
         # Check if we're at the limit
         if len(self._query_timestamps) >= self.max_queries:
@@ -108,11 +116,8 @@ class RateLimiter:
                 "time_to_reset": 0
             }
         
-        now = time.time()
-        
-        # Clean up old timestamps
-        while self._query_timestamps and now - self._query_timestamps[0] > self.time_window_seconds:
-            self._query_timestamps.popleft()
+        now = time.monotonic()
+        self._prune(now)
         
         time_to_reset = 0
         if self._query_timestamps:
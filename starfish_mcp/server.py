@@ -113,13 +113,14 @@ class StarfishMCPServer:
             # Initialize Starfish client
             self.client = StarfishClient(self.config)
             
-            # Test connection by listing collections
-            async with self.client:
-                collections = await self.client.list_collections()
-                logger.info(
-                    "Successfully connected to Starfish API",
-                    total_collections=len(collections)
-                )
+            # Test connection by listing collections. The session stays open
+            # (run() closes it on shutdown) so the first tool call reuses the
+            # token and the already established connection.
+            collections = await self.client.list_collections()
+            logger.info(
+                "Successfully connected to Starfish API",
+                total_collections=len(collections)
+            )
             
             # Initialize tools with config for rate limiting
             self.tools = StarfishTools(self.client, self.config)
@@ -1,6 +1,9 @@
 """Modular Starfish MCP tools."""
 
-from typing import Any, Dict, List
+import asyncio
+import json
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List
 import structlog
 
 from mcp.types import Tool, TextContent
@@ -8,12 +11,42 @@ from mcp.types import Tool, TextContent
 from ..client import StarfishClient
 from ..models import StarfishError
 from ..rate_limiter import RateLimiter
-from .schema import get_starfish_query_schema
+from .schema import (
+    BATCH_DEFAULT_CONCURRENT, BATCH_MAX_CALLS, BATCH_MAX_CONCURRENT, BATCH_SCHEMA, EMPTY_SCHEMA, GET_TAGSET_SCHEMA, GET_VOLUME_SCHEMA, GET_ZONE_SCHEMA,
+    LIST_TAGS_SCHEMA, LIST_TAGSETS_SCHEMA, get_starfish_query_schema
+)
 from .starfish_query import execute_starfish_query
 from .management import list_volumes, list_zones, get_tagset, list_tags, list_tagsets, get_zone, get_volume
+from .serialization import text_content, text_result
 
 logger = structlog.get_logger(__name__)
 
+STARFISH_QUERY_DESCRIPTION = """Comprehensive file and directory search in Starfish with all available filters. Returns detailed metadata including timestamps, permissions, ownership, zones, and tags. Use 'format_fields' parameter to control output detail level. This is the main search tool.
+
+🚨 CRITICAL GUARDRAILS:
+- Rate limited to 5 queries per 10 seconds (configurable) - use broad queries instead of many narrow ones
+- Each query has a 20-second timeout - plan accordingly  
+- Use broad queries instead of iterating through volumes/directories individually
+
+🚨 1000-ROW WARNING - INDICATES INCORRECT APPROACH:
+If you get exactly 1000 rows back, your approach is WRONG! This means you hit the limit and got incomplete data.
+- For directory sizes: Use file_type="d" with rec_aggrs field, not individual file enumeration
+- For file counts: Use limit=0 and read total_found, don't count returned rows
+- For large datasets: Add specific filters (size, mtime, zones, tags) to narrow scope
+- NEVER trust 1000-row results for aggregation or directory analysis
+
+OPTIMIZATION TIPS:
+- Use 'total_found' from response for counts - set limit=0 when you only need counts, don't count results manually
+- For directory analysis: use file_type='d', depth=1, format_fields='fn rec_aggrs', sort_by='-rec_aggrs.size'
+- Use 'fn' for filename (not 'name'), 'rec_aggrs' becomes 'recursive_aggregates' in output
+- recursive_aggregates.size = logical directory tree size, recursive_aggregates.files = file count
+- For tag analysis: set tag='tag_name', limit=0, read total_found for count
+- For largest files: file_type='f', sort_by='-size', format_fields='parent_path fn size'
+
+ANTI-PATTERNS TO AVOID:
+❌ for volume in volumes: query(volumes_and_paths=[volume]) # Multiple queries!
+✅ query(volumes_and_paths=[], format_fields="fn rec_aggrs") # Single broad query"""
+
 
 class StarfishTools:
     """MCP tools for Starfish API operations."""
@@ -31,6 +64,10 @@ class StarfishTools:
         else:
             # Fallback defaults for backwards compatibility
             self.rate_limiter = RateLimiter(max_queries=5, time_window_seconds=10, enabled=True)
+        
+        # The tool list is static, so build it once rather than per tools/list request
+        self._tools = self._build_tools()
+        self._handlers = self._build_handlers()
     
     def reset_rate_limit(self):
         """Reset the rate limiter, clearing all recorded queries."""
@@ -42,147 +79,160 @@ class StarfishTools:
     
     def get_tools(self) -> List[Tool]:
         """Get list of available MCP tools."""
+        return list(self._tools)
+    
+    def _build_tools(self) -> List[Tool]:
+        """Build the list of available MCP tools."""
         return [
             Tool(
                 name="starfish_query", 
-                description="""Comprehensive file and directory search in Starfish with all available filters. Returns detailed metadata including timestamps, permissions, ownership, zones, and tags. Use 'format_fields' parameter to control output detail level. This is the main search tool.
-
-🚨 CRITICAL GUARDRAILS:
-- Rate limited to 5 queries per 10 seconds (configurable) - use broad queries instead of many narrow ones
-- Each query has a 20-second timeout - plan accordingly  
-- Use broad queries instead of iterating through volumes/directories individually
-
-🚨 1000-ROW WARNING - INDICATES INCORRECT APPROACH:
-If you get exactly 1000 rows back, your approach is WRONG! This means you hit the limit and got incomplete data.
-- For directory sizes: Use file_type="d" with rec_aggrs field, not individual file enumeration
-- For file counts: Use limit=0 and read total_found, don't count returned rows
-- For large datasets: Add specific filters (size, mtime, zones, tags) to narrow scope
-- NEVER trust 1000-row results for aggregation or directory analysis
-
-OPTIMIZATION TIPS:
-- Use 'total_found' from response for counts - set limit=0 when you only need counts, don't count results manually
-- For directory analysis: use file_type='d', depth=1, format_fields='fn rec_aggrs', sort_by='-rec_aggrs.size'
-- Use 'fn' for filename (not 'name'), 'rec_aggrs' becomes 'recursive_aggregates' in output
-- recursive_aggregates.size = logical directory tree size, recursive_aggregates.files = file count
-- For tag analysis: set tag='tag_name', limit=0, read total_found for count
-- For largest files: file_type='f', sort_by='-size', format_fields='parent_path fn size'
-
-ANTI-PATTERNS TO AVOID:
-❌ for volume in volumes: query(volumes_and_paths=[volume]) # Multiple queries!
-✅ query(volumes_and_paths=[], format_fields="fn rec_aggrs") # Single broad query""",
+                description=STARFISH_QUERY_DESCRIPTION,
                 inputSchema=get_starfish_query_schema()
             ),
             
             Tool(
                 name="starfish_list_volumes", 
                 description="List all available Starfish volumes with details.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False
-                }
+                inputSchema=EMPTY_SCHEMA
             ),
             
             Tool(
                 name="starfish_list_zones",
                 description="List all available Starfish zones with detailed information.",
-                inputSchema={
-                    "type": "object", 
-                    "properties": {},
-                    "additionalProperties": False
-                }
+                inputSchema=EMPTY_SCHEMA
             ),
             Tool(
                 name="starfish_get_zone", 
                 description="Get detailed information about a specific Starfish zone by ID.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "zone_id": {
-                            "type": "integer",
-                            "description": "ID of the zone to retrieve"
-                        }
-                    },
-                    "required": ["zone_id"]
-                }
+                inputSchema=GET_ZONE_SCHEMA
             ),
             Tool(
                 name="starfish_get_volume", 
                 description="Get detailed information about a specific Starfish volume by ID.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "volume_id": {
-                            "type": "integer",
-                            "description": "ID of the volume to retrieve"
-                        }
-                    },
-                    "required": ["volume_id"]
-                }
+                inputSchema=GET_VOLUME_SCHEMA
             ),
             
             Tool(
                 name="starfish_get_tagset",
                 description="Get detailed information about a specific tagset.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "tagset_name": {
-                            "type": "string",
-                            "description": "Name of the tagset to retrieve (use ':' for default tagset)"
-                        }
-                    },
-                    "required": ["tagset_name"]
-                }
+                inputSchema=GET_TAGSET_SCHEMA
             ),
             Tool(
                 name="starfish_list_tagsets",
                 description="List all available tagsets with detailed information including tag counts.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "random_string": {
-                            "type": "string",
-                            "description": "Dummy parameter for no-parameter tools"
-                        }
-                    },
-                    "required": ["random_string"]
-                }
+                inputSchema=LIST_TAGSETS_SCHEMA
             ),
             Tool(
                 name="starfish_list_tags",
                 description="List all available tags/tagsets in Starfish.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "force_refresh": {
-                            "type": "boolean",
-                            "description": "Force refresh of tags list from server",
-                            "default": False
-                        }
-                    },
-                    "required": []
-                }
+                inputSchema=LIST_TAGS_SCHEMA
             ),
             Tool(
                 name="starfish_reset_rate_limit",
                 description="Reset the rate limiter, clearing query history. Use this when starting a new task if you've hit the rate limit.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False
-                }
+                inputSchema=EMPTY_SCHEMA
             ),
             Tool(
                 name="starfish_get_rate_limit_status",
                 description="Get current rate limit status including queries remaining and time to reset.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False
-                }
+                inputSchema=EMPTY_SCHEMA
+            ),
+            Tool(
+                name="starfish_batch",
+                description="Run several Starfish tool calls concurrently and return all results together. Useful for enumeration flows such as listing volumes and zones and fetching several zones at once. starfish_query calls still count against the rate limit individually.",
+                inputSchema=BATCH_SCHEMA
+            )
+        ]
+    
+    def _build_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[dict]]]:
+        """Map tool names to handlers (starfish_query is dispatched separately)."""
+        client = self.client
+        return {
+            "starfish_list_volumes": partial(list_volumes, client),
+            "starfish_list_zones": partial(list_zones, client),
+            "starfish_get_zone": partial(get_zone, client),
+            "starfish_get_volume": partial(get_volume, client),
+            "starfish_get_tagset": partial(get_tagset, client),
+            "starfish_list_tagsets": partial(list_tagsets, client),
+            "starfish_list_tags": partial(list_tags, client),
+            "starfish_reset_rate_limit": self._handle_reset_rate_limit,
+            "starfish_get_rate_limit_status": self._handle_get_rate_limit_status,
+            "starfish_batch": self._handle_batch,
+        }
+    
+    async def _handle_reset_rate_limit(self, arguments: Dict[str, Any]) -> dict:
+        """Handle the starfish_reset_rate_limit tool."""
+        self.reset_rate_limit()
+        status = self.get_rate_limit_status()
+        return text_content(
+            f"Rate limit reset. You can now run up to {status['max_queries']} queries "
+            f"in {status['time_window_seconds']} seconds."
+        )
+    
+    async def _handle_get_rate_limit_status(self, arguments: Dict[str, Any]) -> dict:
+        """Handle the starfish_get_rate_limit_status tool."""
+        status = self.get_rate_limit_status()
+        if status['enabled']:
+            message = (
+                f"Rate Limit Status:\n"
+                f"• Current queries: {status['current_queries']}/{status['max_queries']}\n"
+                f"• Time window: {status['time_window_seconds']} seconds\n"
+                f"• Queries remaining: {status['queries_remaining']}\n"
+                f"• Time to reset: {status['time_to_reset']:.1f} seconds"
+            )
+        else:
+            message = "Rate limiting is disabled."
+        
+        return text_content(message)
+    
+    async def _handle_batch(self, arguments: Dict[str, Any]) -> dict:
+        """Handle the starfish_batch tool by running each call concurrently."""
+        calls = arguments.get("calls") or []
+        if len(calls) > BATCH_MAX_CALLS:
+            return text_content(
+                f"starfish_batch accepts at most {BATCH_MAX_CALLS} calls, got {len(calls)}"
             )
+        
+        max_concurrent = arguments.get("max_concurrent") or BATCH_DEFAULT_CONCURRENT
+        if not isinstance(max_concurrent, int):
+            max_concurrent = BATCH_DEFAULT_CONCURRENT
+        semaphore = asyncio.Semaphore(min(max(1, max_concurrent), BATCH_MAX_CONCURRENT))
+        
+        async def run(call: Any) -> Dict[str, Any]:
+            tool = call.get("tool") if isinstance(call, dict) else None
+            if not isinstance(tool, str):
+                return {
+                    "tool": tool,
+                    "output": "Each call must be an object with a string 'tool' field"
+                }
+            if tool == "starfish_batch":
+                text = "Nested starfish_batch calls are not supported"
+            else:
+                async with semaphore:
+                    result = await self.handle_tool_call(tool, call.get("arguments") or {})
+                text = result["content"][0]["text"]
+            
+            # Embed JSON payloads as objects; plain-text messages stay strings
+            try:
+                output = json.loads(text)
+            except ValueError:
+                output = text
+            return {"tool": tool, "output": output}
+        
+        logger.info("Running batched tool calls", total_calls=len(calls))
+        # A failing call becomes its own error entry instead of sinking the batch
+        outcomes = await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+        results = [
+            {"tool": call.get("tool") if isinstance(call, dict) else None,
+             "output": f"Tool execution failed: {outcome}"}
+            if isinstance(outcome, BaseException) else outcome
+            for call, outcome in zip(calls, outcomes)
         ]
+        
+        return text_result({
+            "total_calls": len(results),
+            "results": results
+        })
     
     async def handle_tool_call(self, name: str, arguments: Dict[str, Any]):
         """Handle MCP tool calls."""
@@ -191,91 +241,20 @@ ANTI-PATTERNS TO AVOID:
                 # Check rate limit
                 allowed, error_message = self.rate_limiter.check_rate_limit()
                 if not allowed:
-                    return {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": error_message
-                            }
-                        ]
-                    }
+                    return text_content(error_message or "Rate limit exceeded")
                     
                 return await execute_starfish_query(self.client, arguments)
-            elif name == "starfish_list_volumes":
-                return await list_volumes(self.client, arguments)
-            elif name == "starfish_list_zones":
-                return await list_zones(self.client, arguments)
-            elif name == "starfish_get_zone":
-                return await get_zone(self.client, arguments)
-            elif name == "starfish_get_volume":
-                return await get_volume(self.client, arguments)
-            elif name == "starfish_get_tagset":
-                return await get_tagset(self.client, arguments)
-            elif name == "starfish_list_tagsets":
-                return await list_tagsets(self.client, arguments)
-            elif name == "starfish_list_tags":
-                return await list_tags(self.client, arguments)
-            elif name == "starfish_reset_rate_limit":
-                self.reset_rate_limit()
-                status = self.get_rate_limit_status()
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Rate limit reset. You can now run up to {status['max_queries']} queries in {status['time_window_seconds']} seconds."
-                        }
-                    ]
-                }
-            elif name == "starfish_get_rate_limit_status":
-                status = self.get_rate_limit_status()
-                if status['enabled']:
-                    message = (
-                        f"Rate Limit Status:\n"
-                        f"• Current queries: {status['current_queries']}/{status['max_queries']}\n"
-                        f"• Time window: {status['time_window_seconds']} seconds\n"
-                        f"• Queries remaining: {status['queries_remaining']}\n"
-                        f"• Time to reset: {status['time_to_reset']:.1f} seconds"
-                    )
-                else:
-                    message = "Rate limiting is disabled."
-                
-                return {
-                    "content": [
-                        {
-                            "type": "text", 
-                            "text": message
-                        }
-                    ]
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Unknown tool: {name}"
-                        }
-                    ]
-                }
+            
+            handler = self._handlers.get(name)
+            if handler is None:
+                return text_content(f"Unknown tool: {name}")
+            return await handler(arguments)
         except StarfishError as e:
             logger.error("Starfish API error", tool=name, error=str(e))
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Starfish API error: {e}"
-                    }
-                ]
-            }
+            return text_content(f"Starfish API error: {e}")
         except Exception as e:
             logger.error("Tool execution failed", tool=name, error=str(e))
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Tool execution failed: {e}"
-                    }
-                ]
-            }
+            return text_content(f"Tool execution failed: {e}")
 
 
 # For backward compatibility, export the class
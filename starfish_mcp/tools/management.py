@@ -1,16 +1,79 @@
 """Starfish management tools - volumes, zones, tagsets."""
 
-import json
-from typing import Any, Dict
+import asyncio
+from typing import Any, Dict, Iterable, List
 import structlog
+from pydantic import ValidationError
 
 from mcp.types import TextContent
 
 from ..client import StarfishClient
-from ..models import StarfishError
+from ..models import StarfishError, StarfishTagsetResponse, StarfishZoneDetails, VolumeInfo
+from .serialization import text_result
 
 logger = structlog.get_logger(__name__)
 
+# Upper bound on concurrent get_tagset requests when list_tagsets prefetches
+TAGSET_PREFETCH_CONCURRENCY = 16
+
+
+def _format_volume(volume: VolumeInfo) -> Dict[str, Any]:
+    """Convert a VolumeInfo into the list_volumes output shape."""
+    volume_data = {
+        "id": volume.id,
+        "name": volume.vol,
+        "display_name": volume.display_name,
+        "root": volume.root,
+        "type": volume.type,
+        "default_agent_address": volume.default_agent_address,
+        "total_capacity": volume.total_capacity,
+        "free_space": volume.free_space,
+        "mounts": volume.mounts,
+        "mount_opts": volume.mount_opts
+    }
+    
+    # Add volume size info if available
+    if volume.volume_size_info:
+        volume_data["size_info"] = {
+            "number_of_files": volume.number_of_files,
+            "number_of_dirs": volume.number_of_dirs,
+            "sum_of_logical_sizes": volume.sum_of_logical_sizes,
+            "sum_of_physical_sizes": volume.sum_of_physical_sizes,
+            "sum_of_blocks": volume.sum_of_blocks
+        }
+    
+    return volume_data
+
+
+def _format_zone_summary(zone: StarfishZoneDetails) -> Dict[str, Any]:
+    """Convert zone details into the fields shared by list_zones and get_tagset."""
+    return {
+        "id": zone.id,
+        "name": zone.name,
+        "paths": zone.paths,
+        "managers": [{"system_id": m.system_id, "username": m.username} for m in zone.managers],
+        "managing_groups": [{"system_id": g.system_id, "groupname": g.groupname} for g in zone.managing_groups],
+        "tagsets": [{"name": t.name, "tag_names": t.tag_names} for t in zone.tagsets],
+        "user_params": zone.user_params
+    }
+
+
+def _format_zone(zone: StarfishZoneDetails) -> Dict[str, Any]:
+    """Convert zone details into the list_zones/get_zone output shape."""
+    zone_data = _format_zone_summary(zone)
+    zone_data["restore_managers"] = zone.restore_managers
+    zone_data["restore_managing_groups"] = zone.restore_managing_groups
+    
+    aggregates = zone.aggregates
+    zone_data["aggregates"] = {
+        "size": aggregates.size,
+        "dirs": aggregates.dirs,
+        "files": aggregates.files,
+        "cost": aggregates.cost
+    } if aggregates else None
+    
+    return zone_data
+
 
 async def list_volumes(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
     """List available Starfish volumes."""
@@ -18,45 +81,10 @@ async def list_volumes(client: StarfishClient, arguments: Dict[str, Any]) -> dic
     
     volumes = await client.list_volumes()
     
-    # Convert to JSON
-    results = []
-    for volume in volumes:
-        volume_data = {
-            "id": volume.id,
-            "name": volume.vol,
-            "display_name": volume.display_name,
-            "root": volume.root,
-            "type": volume.type,
-            "default_agent_address": volume.default_agent_address,
-            "total_capacity": volume.total_capacity,
-            "free_space": volume.free_space,
-            "mounts": volume.mounts,
-            "mount_opts": volume.mount_opts
-        }
-        
-        # Add volume size info if available
-        if volume.volume_size_info:
-            volume_data["size_info"] = {
-                "number_of_files": volume.number_of_files,
-                "number_of_dirs": volume.number_of_dirs,
-                "sum_of_logical_sizes": volume.sum_of_logical_sizes,
-                "sum_of_physical_sizes": volume.sum_of_physical_sizes,
-                "sum_of_blocks": volume.sum_of_blocks
-            }
-        
-        results.append(volume_data)
-    
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps({
-                    "total_volumes": len(results),
-                    "volumes": results
-                }, indent=2)
-            }
-        ]
-    }
+    return text_result({
+        "total_volumes": len(volumes),
+        "volumes": [_format_volume(volume) for volume in volumes]
+    })
 
 
 async def list_zones(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
@@ -65,39 +93,10 @@ async def list_zones(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
     
     zones = await client.list_zones()
     
-    # Convert to JSON
-    results = []
-    for zone in zones:
-        zone_data = {
-            "id": zone.id,
-            "name": zone.name,
-            "paths": zone.paths,
-            "managers": [{"system_id": m.system_id, "username": m.username} for m in zone.managers],
-            "managing_groups": [{"system_id": g.system_id, "groupname": g.groupname} for g in zone.managing_groups],
-            "restore_managers": zone.restore_managers,
-            "restore_managing_groups": zone.restore_managing_groups,
-            "tagsets": [{"name": t.name, "tag_names": t.tag_names} for t in zone.tagsets],
-            "user_params": zone.user_params,
-            "aggregates": {
-                "size": zone.aggregates.size if zone.aggregates else None,
-                "dirs": zone.aggregates.dirs if zone.aggregates else None,
-                "files": zone.aggregates.files if zone.aggregates else None,
-                "cost": zone.aggregates.cost if zone.aggregates else None
-            } if zone.aggregates else None
-        }
-        results.append(zone_data)
-    
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps({
-                    "total_zones": len(results),
-                    "zones": results
-                }, indent=2)
-            }
-        ]
-    }
+    return text_result({
+        "total_zones": len(zones),
+        "zones": [_format_zone(zone) for zone in zones]
+    })
 
 
 async def get_tagset(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
@@ -109,7 +108,6 @@ async def get_tagset(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
     tagset_data = await client.get_tagset(tagset_name)
     
     # Parse the raw dict response into a model
-    from ..models import StarfishTagsetResponse
     tagset = StarfishTagsetResponse(**tagset_data)
     
     # Convert to JSON
@@ -120,41 +118,48 @@ async def get_tagset(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
         "pinnable": tagset.pinnable,
         "action": tagset.action.value if tagset.action else None,
         "tags": [{"id": tag.id, "name": tag.name} for tag in tagset.tags],
-        "zones": []
+        "zones": [_format_zone_summary(zone) for zone in tagset.zones]
     }
     
-    # Add zone details
-    for zone in tagset.zones:
-        zone_data = {
-            "id": zone.id,
-            "name": zone.name,
-            "paths": zone.paths,
-            "managers": [{"system_id": m.system_id, "username": m.username} for m in zone.managers],
-            "managing_groups": [{"system_id": g.system_id, "groupname": g.groupname} for g in zone.managing_groups],
-            "tagsets": [{"name": t.name, "tag_names": t.tag_names} for t in zone.tagsets],
-            "user_params": zone.user_params
-        }
-        result["zones"].append(zone_data)
+    return text_result(result)
+
+
+async def _fetch_tagset_details(client: StarfishClient, names: Iterable[str]) -> List[Any]:
+    """Fetch several tagsets concurrently; failures are returned, not raised."""
+    semaphore = asyncio.Semaphore(TAGSET_PREFETCH_CONCURRENCY)
     
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps(result, indent=2)
-            }
-        ]
-    }
+    async def fetch(name: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await client.get_tagset(name)
+    
+    results: List[Any] = await asyncio.gather(
+        *(fetch(name) for name in names), return_exceptions=True
+    )
+    return results
 
 
 async def list_tagsets(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
     """List all available tagsets with their details."""
-    logger.info("Listing Starfish tagsets")
+    prefetch_details = arguments.get("prefetch_details", False)
+    
+    logger.info("Listing Starfish tagsets", prefetch_details=prefetch_details)
     
     tagsets_data = await client.list_tagsets()
     
+    details: List[Any] = [None] * len(tagsets_data)
+    if prefetch_details:
+        # get_tagset("") means the default tagset, so nameless entries are
+        # not fetched and keep no details
+        named = [i for i, tagset in enumerate(tagsets_data) if tagset.get("name")]
+        fetched = await _fetch_tagset_details(
+            client, (tagsets_data[i]["name"] for i in named)
+        )
+        for i, detail in zip(named, fetched):
+            details[i] = detail
+    
     # Convert to more readable format
     results = []
-    for tagset in tagsets_data:
+    for tagset, detail in zip(tagsets_data, details):
         tagset_info = {
             "name": tagset.get("name"),
             "zone_ids": tagset.get("zone_ids", []),
@@ -165,17 +170,26 @@ async def list_tagsets(client: StarfishClient, arguments: Dict[str, Any]) -> dic
             "zone_count": len(tagset.get("zones", []))
         }
         
-        # Add sample tags if available
-        tags = tagset.get("tags", [])
-        if tags:
-            tagset_info["sample_tags"] = [tag.get("name") for tag in tags[:5]]  # First 5 tags
-            if len(tags) > 5:
-                tagset_info["sample_tags"].append(f"... and {len(tags) - 5} more")
+        if isinstance(detail, dict):
+            # Full tag list from the prefetched tagset
+            tag_names = [tag.get("name") for tag in detail.get("tags", [])]
+            tagset_info["tag_count"] = len(tag_names)
+            tagset_info["tags"] = tag_names
+        else:
+            if isinstance(detail, Exception):
+                tagset_info["details_error"] = str(detail)
+            
+            # Add sample tags if available
+            tags = tagset.get("tags", [])
+            if tags:
+                tagset_info["sample_tags"] = [tag.get("name") for tag in tags[:5]]  # First 5 tags
+                if len(tags) > 5:
+                    tagset_info["sample_tags"].append(f"... and {len(tags) - 5} more")
         
         results.append(tagset_info)
     
     # Sort by name
-    results.sort(key=lambda x: x.get("name", ""))
+    results.sort(key=lambda x: x["name"] or "")
     
     result = {
         "total_tagsets": len(results),
@@ -183,14 +197,7 @@ async def list_tagsets(client: StarfishClient, arguments: Dict[str, Any]) -> dic
         "note": "Use starfish_get_tagset with any tagset name to get complete details including all tags"
     }
     
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps(result, indent=2)
-            }
-        ]
-    }
+    return text_result(result)
 
 
 async def get_zone(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
@@ -201,28 +208,16 @@ async def get_zone(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
     
     zone_data = await client.get_zone(zone_id)
     
-    # Format the zone data
-    result = {
-        "id": zone_data.get("id"),
-        "name": zone_data.get("name"),
-        "paths": zone_data.get("paths", []),
-        "managers": zone_data.get("managers", []),
-        "managing_groups": zone_data.get("managing_groups", []),
-        "restore_managers": zone_data.get("restore_managers", []),
-        "restore_managing_groups": zone_data.get("restore_managing_groups", []),
-        "tagsets": zone_data.get("tagsets", []),
-        "user_params": zone_data.get("user_params", {}),
-        "aggregates": zone_data.get("aggregates")
-    }
+    # Parse the raw dict response into a model and format it like list_zones.
+    # A payload the model can't validate is returned as the API sent it.
+    try:
+        zone = StarfishZoneDetails(**zone_data)
+    except ValidationError as e:
+        logger.warning("Zone details did not validate, returning raw payload",
+                       zone_id=zone_id, error=str(e))
+        return text_result(zone_data)
     
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps(result, indent=2)
-            }
-        ]
-    }
+    return text_result(_format_zone(zone))
 
 
 async def get_volume(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
@@ -248,14 +243,7 @@ async def get_volume(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
         "volume_size_info": volume_data.get("volume_size_info")
     }
     
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps(result, indent=2)
-            }
-        ]
-    }
+    return text_result(result)
 
 
 async def list_tags(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
@@ -272,11 +260,4 @@ async def list_tags(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
         "note": "Use starfish_get_tagset with any of these names to get detailed tagset information"
     }
     
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps(result, indent=2)
-            }
-        ]
-    }
+    return text_result(result)
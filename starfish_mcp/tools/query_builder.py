@@ -1,216 +1,144 @@
 """Starfish query string builder from parameters."""
 
-from typing import Dict, Any, List
+import logging
+import re
+from typing import Dict, Any, List, Tuple
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# structlog pays for the debug() call even when the level filters it out, so
+# the hot path checks the underlying stdlib logger first
+_stdlib_logger = logging.getLogger(__name__)
 
-def build_starfish_query(arguments: Dict[str, Any]) -> str:
-    """Build Starfish query string from tool arguments."""
-    # Extract parameters
-    name = arguments.get("name")
-    name_regex = arguments.get("name_regex")
-    path = arguments.get("path")
-    path_regex = arguments.get("path_regex")
-    file_type = arguments.get("file_type")
-    ext = arguments.get("ext")
-    empty = arguments.get("empty")
-    uid = arguments.get("uid")
-    gid = arguments.get("gid")
-    username = arguments.get("username")
-    username_regex = arguments.get("username_regex")
-    groupname = arguments.get("groupname")
-    groupname_regex = arguments.get("groupname_regex")
-    inode = arguments.get("inode")
-    size = arguments.get("size")
-    nlinks = arguments.get("nlinks")
-    iname = arguments.get("iname")
-    iusername = arguments.get("iusername")
-    igroupname = arguments.get("igroupname")
-    depth = arguments.get("depth")
-    maxdepth = arguments.get("maxdepth")
-    perm = arguments.get("perm")
-    mtime = arguments.get("mtime")
-    ctime = arguments.get("ctime")
-    atime = arguments.get("atime")
-    search_all = arguments.get("search_all")
-    versions = arguments.get("versions")
-    children_only = arguments.get("children_only")
-    root_only = arguments.get("root_only")
-    tag = arguments.get("tag")
-    tag_explicit = arguments.get("tag_explicit")
-    zone = arguments.get("zone")
-    
-    # Build query parts
-    query_parts = []
-    
+# Characters that mark a filename as a regex rather than a plain/shell name
+_REGEX_META = re.compile(r'[()\[\]{}|+?]')
+
+
+# How a parameter becomes a query token
+_IF_SET = 0        # emit token + value when the value is truthy
+_IF_NOT_NONE = 1   # emit token + value whenever it is given (0 is valid)
+_REGEX = 2         # like _IF_SET, but anchor the pattern with ^
+_FLAG = 3          # emit the bare token when the value is truthy
+_NAME = 4          # filename: shell pattern or regex, see _format_name
+
+# (argument, token, kind) in the order the tokens appear in the query.
+# Tokens are joined to values with + rather than str.format, which is
+# roughly twice as fast for a single substitution.
+_QUERY_PARAMS: Tuple[Tuple[str, str, int], ...] = (
     # File type
-    if file_type:
-        query_parts.append(f"type={file_type}")
-    
+    ("file_type", "type=", _IF_SET),
     # Names and paths
-    if name:
-        # Check if it's a regex pattern (starts with ^ or contains regex chars)
-        if name.startswith('^') or any(c in name for c in ['(', ')', '[', ']', '{', '}', '|', '+', '?']):
-            if not name.startswith('^'):
-                name = '^' + name
-            query_parts.append(f"name-re={name}")
-        elif '*' in name or '?' in name:
-            # Shell pattern
-            query_parts.append(f"name={name}")
-        else:
-            # Exact match for alphanumeric
-            query_parts.append(f"name={name}")
-    
-    if name_regex:
-        if not name_regex.startswith('^'):
-            name_regex = '^' + name_regex
-        query_parts.append(f"name-re={name_regex}")
-    
-    if path:
-        query_parts.append(f"ppath={path}")
-    
-    if path_regex:
-        if not path_regex.startswith('^'):
-            path_regex = '^' + path_regex
-        query_parts.append(f"ppath-re={path_regex}")
-    
+    ("name", "", _NAME),
+    ("name_regex", "name-re=", _REGEX),
+    ("path", "ppath=", _IF_SET),
+    ("path_regex", "ppath-re=", _REGEX),
     # File attributes
-    if ext:
-        query_parts.append(f"ext={ext}")
-    
-    if empty is not None:
-        if empty:
-            query_parts.append("empty")
-    
-    if inode:
-        query_parts.append(f"inode={inode}")
-    
+    ("ext", "ext=", _IF_SET),
+    ("empty", "empty", _FLAG),
+    ("inode", "inode=", _IF_SET),
     # Ownership
-    if uid is not None:
-        query_parts.append(f"uid={uid}")
-    
-    if gid is not None:
-        query_parts.append(f"gid={gid}")
-    
-    if username:
-        query_parts.append(f"username={username}")
-    
-    if username_regex:
-        if not username_regex.startswith('^'):
-            username_regex = '^' + username_regex
-        query_parts.append(f"username-re={username_regex}")
-    
-    if groupname:
-        query_parts.append(f"groupname={groupname}")
-    
-    if groupname_regex:
-        if not groupname_regex.startswith('^'):
-            groupname_regex = '^' + groupname_regex
-        query_parts.append(f"groupname-re={groupname_regex}")
-    
+    ("uid", "uid=", _IF_NOT_NONE),
+    ("gid", "gid=", _IF_NOT_NONE),
+    ("username", "username=", _IF_SET),
+    ("username_regex", "username-re=", _REGEX),
+    ("groupname", "groupname=", _IF_SET),
+    ("groupname_regex", "groupname-re=", _REGEX),
     # Size and links
-    if size:
-        query_parts.append(f"size={size}")
-    
-    if nlinks:
-        query_parts.append(f"nlinks={nlinks}")
-    
+    ("size", "size=", _IF_SET),
+    ("nlinks", "nlinks=", _IF_SET),
     # Case-insensitive versions
-    if iname:
-        query_parts.append(f"iname={iname}")
-    
-    if iusername:
-        query_parts.append(f"iusername={iusername}")
-    
-    if igroupname:
-        query_parts.append(f"igroupname={igroupname}")
-    
+    ("iname", "iname=", _IF_SET),
+    ("iusername", "iusername=", _IF_SET),
+    ("igroupname", "igroupname=", _IF_SET),
     # Depth
-    if depth is not None:
-        query_parts.append(f"depth={depth}")
-    
-    if maxdepth is not None:
-        query_parts.append(f"maxdepth={maxdepth}")
-    
+    ("depth", "depth=", _IF_NOT_NONE),
+    ("maxdepth", "maxdepth=", _IF_NOT_NONE),
     # Permissions
-    if perm:
-        query_parts.append(f"perm={perm}")
-    
+    ("perm", "perm=", _IF_SET),
     # Time filters
-    if mtime:
-        query_parts.append(f"mtime={mtime}")
-    
-    if ctime:
-        query_parts.append(f"ctime={ctime}")
-    
-    if atime:
-        query_parts.append(f"atime={atime}")
-    
+    ("mtime", "mtime=", _IF_SET),
+    ("ctime", "ctime=", _IF_SET),
+    ("atime", "atime=", _IF_SET),
     # Query options
-    if search_all:
-        query_parts.append("search-all")
-    
-    if versions:
-        query_parts.append("versions")
-    
-    if children_only:
-        query_parts.append("children-only")
-    
-    if root_only:
-        query_parts.append("root-only")
-    
+    ("search_all", "search-all", _FLAG),
+    ("versions", "versions", _FLAG),
+    ("children_only", "children-only", _FLAG),
+    ("root_only", "root-only", _FLAG),
     # Tags
-    if tag:
-        query_parts.append(f"tag={tag}")
-    
-    if tag_explicit:
-        query_parts.append(f"tag-explicit={tag_explicit}")
-    
+    ("tag", "tag=", _IF_SET),
+    ("tag_explicit", "tag-explicit=", _IF_SET),
     # Zone
-    if zone:
-        query_parts.append(f"zone={zone}")
+    ("zone", "zone=", _IF_SET),
+)
+
+# Stands in for arguments that weren't passed at all
+_MISSING = object()
+
+# Filter arguments reported back in query results
+_META_KEYS: Tuple[str, ...] = tuple(key for key, _, _ in _QUERY_PARAMS)
+
+
+def _anchor(pattern: str) -> str:
+    """Prefix a regex with ^ unless it is already anchored."""
+    if not pattern.startswith('^'):
+        pattern = '^' + pattern
+    return pattern
+
+
+def _format_name(name: str) -> str:
+    """Build the filename token, treating regex-looking names as name-re."""
+    # Check if it's a regex pattern (starts with ^ or contains regex chars)
+    if name.startswith('^') or _REGEX_META.search(name):
+        return "name-re=" + _anchor(name)
+    # Shell patterns (*, ?) and exact names both use name=
+    return "name=" + name
+
+
+def build_starfish_query_with_metadata(arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Build the query string and the filters_applied metadata in one pass.
+    
+    Equivalent to (build_starfish_query(arguments), extract_query_metadata(arguments)).
+    """
+    get = arguments.get
+    query_parts = []
+    metadata = {}
+    
+    for key, token, kind in _QUERY_PARAMS:
+        value = get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        metadata[key] = value
+        
+        if kind == _IF_NOT_NONE:
+            if value is not None:
+                query_parts.append(token + str(value))
+        elif not value:
+            continue
+        elif kind == _IF_SET:
+            query_parts.append(token + str(value))
+        elif kind == _FLAG:
+            query_parts.append(token)
+        elif kind == _REGEX:
+            query_parts.append(token + _anchor(value))
+        else:
+            query_parts.append(_format_name(value))
     
     query = " ".join(query_parts)
     
-    logger.debug("Built Starfish query", query=query, total_parts=len(query_parts))
-    return query
+    if _stdlib_logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Built Starfish query", query=query, total_parts=len(query_parts))
+    return query, metadata
+
+
+def build_starfish_query(arguments: Dict[str, Any]) -> str:
+    """Build Starfish query string from tool arguments."""
+    return build_starfish_query_with_metadata(arguments)[0]
 
 
 def extract_query_metadata(arguments: Dict[str, Any]) -> Dict[str, Any]:
-    """Extract metadata about applied filters for result output."""
-    return {
-        "name": arguments.get("name"),
-        "name_regex": arguments.get("name_regex"),
-        "path": arguments.get("path"),
-        "path_regex": arguments.get("path_regex"),
-        "file_type": arguments.get("file_type"),
-        "ext": arguments.get("ext"),
-        "empty": arguments.get("empty"),
-        "uid": arguments.get("uid"),
-        "gid": arguments.get("gid"),
-        "username": arguments.get("username"),
-        "username_regex": arguments.get("username_regex"),
-        "groupname": arguments.get("groupname"),
-        "groupname_regex": arguments.get("groupname_regex"),
-        "inode": arguments.get("inode"),
-        "size": arguments.get("size"),
-        "nlinks": arguments.get("nlinks"),
-        "iname": arguments.get("iname"),
-        "iusername": arguments.get("iusername"),
-        "igroupname": arguments.get("igroupname"),
-        "depth": arguments.get("depth"),
-        "maxdepth": arguments.get("maxdepth"),
-        "perm": arguments.get("perm"),
-        "mtime": arguments.get("mtime"),
-        "ctime": arguments.get("ctime"),
-        "atime": arguments.get("atime"),
-        "search_all": arguments.get("search_all"),
-        "versions": arguments.get("versions"),
-        "children_only": arguments.get("children_only"),
-        "root_only": arguments.get("root_only"),
-        "tag": arguments.get("tag"),
-        "tag_explicit": arguments.get("tag_explicit"),
-        "zone": arguments.get("zone")
-    }
+    """Extract metadata about applied filters for result output.
+    
+    Only filters present in arguments are included.
+    """
+    return {key: arguments[key] for key in _META_KEYS if key in arguments}
@@ -1,10 +1,125 @@
 """Starfish query parameter schemas and definitions."""
 
+from functools import lru_cache
 from typing import Dict, Any
 
+# Input schemas for the simple tools. These never change, so they are built
+# once at import time rather than as literals inside the tool list.
+EMPTY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {},
+    "additionalProperties": False
+}
 
+GET_ZONE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "zone_id": {
+            "type": "integer",
+            "description": "ID of the zone to retrieve"
+        }
+    },
+    "required": ["zone_id"]
+}
+
+GET_VOLUME_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "volume_id": {
+            "type": "integer",
+            "description": "ID of the volume to retrieve"
+        }
+    },
+    "required": ["volume_id"]
+}
+
+GET_TAGSET_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "tagset_name": {
+            "type": "string",
+            "description": "Name of the tagset to retrieve (use ':' for default tagset)"
+        }
+    },
+    "required": ["tagset_name"]
+}
+
+LIST_TAGSETS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "random_string": {
+            "type": "string",
+            "description": "Dummy parameter for no-parameter tools"
+        },
+        "prefetch_details": {
+            "type": "boolean",
+            "default": False,
+            "description": "Fetch every tagset's full tag list concurrently and include it, instead of a 5-tag sample"
+        }
+    },
+    "required": ["random_string"]
+}
+
+LIST_TAGS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "force_refresh": {
+            "type": "boolean",
+            "description": "Force refresh of tags list from server",
+            "default": False
+        }
+    },
+    "required": []
+}
+
+# Bounds for starfish_batch. Only starfish_query is rate limited, so these
+# keep a single batch from fanning out an unbounded number of other calls.
+BATCH_MAX_CALLS = 50
+BATCH_MAX_CONCURRENT = 16
+BATCH_DEFAULT_CONCURRENT = 4
+
+BATCH_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "calls": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": BATCH_MAX_CALLS,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "tool": {
+                        "type": "string",
+                        "description": "Name of the Starfish tool to call (any tool except starfish_batch)"
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments for the tool call"
+                    }
+                },
+                "required": ["tool"]
+            },
+            "description": "Tool calls to run. Example: [{'tool': 'starfish_list_volumes'}, {'tool': 'starfish_get_zone', 'arguments': {'zone_id': 1}}]"
+        },
+        "max_concurrent": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": BATCH_MAX_CONCURRENT,
+            "default": BATCH_DEFAULT_CONCURRENT,
+            "description": "Maximum number of calls to run at the same time"
+        }
+    },
+    "required": ["calls"]
+}
+
+
+@lru_cache(maxsize=None)
 def get_starfish_query_schema() -> Dict[str, Any]:
-    """Get the comprehensive starfish_query tool input schema."""
+    """Get the comprehensive starfish_query tool input schema.
+    
+    The schema is built once and the same dict is returned on every call;
+    treat it as read-only.
+    """
     return {
         "type": "object",
         "properties": {
@@ -178,12 +293,22 @@ def get_starfish_query_schema() -> Dict[str, Any]:
                 "type": "string",
                 "description": "Space-separated fields to include in output. Common fields: 'parent_path fn size mtime atime ctime uid gid mode nlinks inode zones tags rec_aggrs'. Examples: 'fn size mtime zones' (basic), 'parent_path fn size mtime atime ctime uid gid mode tags zones rec_aggrs' (detailed). Use 'fn' not 'name' for filename. Use 'rec_aggrs' for recursive directory statistics. Default includes all common fields."
             },
+            "pretty": {
+                "type": "boolean",
+                "default": False,
+                "description": "Indent the JSON response for human reading. Leave off for compact output"
+            },
+            "no_cache": {
+                "type": "boolean",
+                "default": False,
+                "description": "Always send a fresh request to Starfish: never share the result of an identical query already in flight, and skip the result cache when the server enables QUERY_CACHE_TTL_SECONDS"
+            },
             
             # Performance
             "use_async": {
                 "type": "boolean",
                 "default": False,
-                "description": "Use async query API for better performance on large searches"
+                "description": "Use async query API for better performance on large searches. Always used when volumes_and_paths is set and limit is above 1000"
             }
         },
         "additionalProperties": False
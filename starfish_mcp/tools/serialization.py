@@ -0,0 +1,52 @@
+"""JSON serialization helpers for tool responses.
+
+Tool output is consumed by MCP clients, not read by people, so responses are
+encoded compactly unless indentation is explicitly requested. orjson is used
+when installed and the standard library encoder otherwise. Both encode
+datetimes as ISO 8601 strings.
+"""
+
+import json
+from datetime import date, datetime
+from types import ModuleType
+from typing import Any, Optional
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode types the stdlib encoder doesn't handle natively."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize obj to a compact JSON string, or indented if pretty is set."""
+    if orjson is not None:
+        encoded: bytes = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        return encoded.decode()
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def text_content(text: str) -> dict:
+    """Wrap already-encoded text as a single-text-item MCP tool result."""
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": text
+            }
+        ]
+    }
+
+
+def text_result(obj: Any, pretty: bool = False) -> dict:
+    """Wrap obj as a single-text-item MCP tool result."""
+    return text_content(dumps(obj, pretty))
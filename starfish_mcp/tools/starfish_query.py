@@ -1,30 +1,251 @@
 """Starfish comprehensive query tool implementation."""
 
-import json
-from typing import Any, Dict, List
+import asyncio
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
 import structlog
 
 from mcp.types import TextContent
 
 from ..client import StarfishClient
-from ..models import StarfishError
-from .query_builder import build_starfish_query, extract_query_metadata
+from ..models import StarfishEntry, StarfishError
+from .query_builder import build_starfish_query_with_metadata
+from .schema import get_starfish_query_schema
+from .serialization import text_result
 
 logger = structlog.get_logger(__name__)
 
+# Defaults come from the tool schema so the two can't drift apart
+_SCHEMA_PROPERTIES = get_starfish_query_schema()["properties"]
+DEFAULT_LIMIT: int = _SCHEMA_PROPERTIES["limit"]["default"]
+DEFAULT_USE_ASYNC: bool = _SCHEMA_PROPERTIES["use_async"]["default"]
+DEFAULT_PRETTY: bool = _SCHEMA_PROPERTIES["pretty"]["default"]
+DEFAULT_NO_CACHE: bool = _SCHEMA_PROPERTIES["no_cache"]["default"]
+
+# Scoped queries with a larger limit always go through the async query API,
+# which the server handles in batches instead of one blocking response
+ASYNC_LIMIT_THRESHOLD = 1000
+
+# Upper bound on concurrent /query/ requests when a sync query spans several
+# volumes_and_paths
+QUERY_FANOUT_CONCURRENCY = 4
+
+
+@dataclass(frozen=True)
+class QueryOptions:
+    """Execution options for starfish_query (everything except the filters)."""
+    
+    volumes_and_paths: List[str] = field(default_factory=list)
+    limit: int = DEFAULT_LIMIT
+    sort_by: Optional[str] = None
+    format_fields: Optional[str] = None
+    use_async: bool = DEFAULT_USE_ASYNC
+    pretty: bool = DEFAULT_PRETTY
+    no_cache: bool = DEFAULT_NO_CACHE
+    
+    @classmethod
+    def from_arguments(cls, arguments: Dict[str, Any]) -> "QueryOptions":
+        """Parse execution options from raw tool arguments in a single pass."""
+        get = arguments.get
+        limit = get("limit")
+        return cls(
+            volumes_and_paths=get("volumes_and_paths") or [],
+            # An explicit null means the default; 0 is passed through as given
+            limit=DEFAULT_LIMIT if limit is None else limit,
+            sort_by=get("sort_by"),
+            format_fields=get("format_fields"),
+            use_async=get("use_async", DEFAULT_USE_ASYNC),
+            pretty=get("pretty", DEFAULT_PRETTY),
+            no_cache=get("no_cache", DEFAULT_NO_CACHE)
+        )
+
+
+# Optional directory metadata copied through when present, in output order
+_DIRECTORY_FIELDS = ("entries_count", "logical_size", "physical_size", "cost", "depth")
+
+
+def _format_entry(entry: StarfishEntry) -> Dict[str, Any]:
+    """Convert a query result entry into the starfish_query output shape."""
+    # Plain declared fields are read straight from the model's __dict__;
+    # anything the model derives goes through its properties.
+    fields = entry.__dict__
+    result = {
+        "id": fields["id"],
+        "filename": fields["filename"],
+        "parent_path": fields["parent_path"],
+        "full_path": fields["full_path"],
+        "volume": fields["volume"],
+        "size": fields["size"],
+        "type": "file" if entry.is_file else "directory",
+        "uid": fields["uid"],
+        "gid": fields["gid"],
+        "mode": fields["mode"]
+    }
+    
+    # Add time information if available (the encoder emits ISO 8601)
+    create_time = entry.create_time
+    if create_time:
+        result["create_time"] = create_time
+    modify_time = entry.modify_time
+    if modify_time:
+        result["modify_time"] = modify_time
+    access_time = entry.access_time
+    if access_time:
+        result["access_time"] = access_time
+    
+    # Add tags if available
+    all_tags = entry.all_tags
+    if all_tags:
+        result["tags"] = all_tags
+    
+    # Add zones if available. StarfishZone's fields are exactly the output
+    # keys (id, name, relative_path), so a copy of its __dict__ is the zone
+    # dict without per-key lookups.
+    zones = fields["zones"]
+    if zones:
+        result["zones"] = [z.__dict__.copy() for z in zones]
+    
+    # Add aggregation data for directories
+    aggrs = fields["aggrs"]
+    if aggrs:
+        result["local_aggregates"] = aggrs
+    rec_aggrs = fields["rec_aggrs"]
+    if rec_aggrs:
+        result["recursive_aggregates"] = rec_aggrs
+    
+    # Undeclared fields such as local_aggr land in __pydantic_extra__
+    extra_fields = entry.__pydantic_extra__
+    if extra_fields and 'local_aggr' in extra_fields:
+        result["local_aggregates_alt"] = extra_fields['local_aggr']
+    
+    # Add additional directory metadata
+    for key in _DIRECTORY_FIELDS:
+        value = fields[key]
+        if value is not None:
+            result[key] = value
+    
+    return result
+
+
+# Starfish sort field names mapped to StarfishEntry attributes: every field
+# alias (_id, fn, mt, tags_explicit, ...) plus the long time names
+_SORT_FIELD_ATTRIBUTES = {
+    field_info.alias: name
+    for name, field_info in StarfishEntry.model_fields.items()
+    if field_info.alias
+}
+_SORT_FIELD_ATTRIBUTES.update({
+    "ctime": "create_time_unix",
+    "mtime": "modify_time_unix",
+    "atime": "access_time_unix",
+})
+
+
+def _sort_value(entry: StarfishEntry, path: str) -> Any:
+    """Look up a (possibly dotted, e.g. rec_aggrs.size) sort field on an entry.
+    
+    Names that aren't model fields are looked up in the entry's extra fields.
+    """
+    name, *keys = path.split(".")
+    attribute = _SORT_FIELD_ATTRIBUTES.get(name, name)
+    value = entry.__dict__.get(attribute)
+    if value is None and entry.__pydantic_extra__:
+        value = entry.__pydantic_extra__.get(name)
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Order values of mixed types: numbers, then strings, then anything else."""
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, str(value))
+
+
+def _sort_entries(entries: List[StarfishEntry], sort_by: str) -> List[StarfishEntry]:
+    """Sort entries by a Starfish sort_by spec such as '-size' or '+parent_path,size'.
+    
+    Keys are applied least significant first with stable sorts, so each can
+    have its own direction. Entries missing a key sort after those that have it,
+    so a key no entry carries leaves the order to the other keys.
+    Per-scope results arrive already sorted, which Timsort merges as runs.
+    """
+    for spec in reversed([s.strip() for s in sort_by.split(",") if s.strip()]):
+        descending = spec.startswith("-")
+        path = spec.lstrip("+-")
+        present: List[Tuple[Tuple[int, Any], StarfishEntry]] = []
+        missing: List[StarfishEntry] = []
+        for entry in entries:
+            value = _sort_value(entry, path)
+            if value is None:
+                missing.append(entry)
+            else:
+                present.append((_sort_key(value), entry))
+        present.sort(key=itemgetter(0), reverse=descending)
+        entries = [entry for _, entry in present] + missing
+    return entries
+
+
+async def _query_each_scope(client: StarfishClient, volumes_and_paths: List[str],
+                            limit: int, sort_by: Optional[str] = None,
+                            **query_args: Any) -> List[StarfishEntry]:
+    """Run a sync query once per volume:path concurrently and merge the results.
+    
+    /query/ takes a single scope, so each one is queried separately. With
+    sort_by, every scope is awaited and the results are merged by the sort
+    keys before cutting to limit. Without it, results are concatenated in
+    scope order, and once the scopes merged so far fill limit, requests for
+    the later scopes are cancelled.
+    """
+    semaphore = asyncio.Semaphore(QUERY_FANOUT_CONCURRENCY)
+    
+    async def run(scope: str) -> List[StarfishEntry]:
+        async with semaphore:
+            return await client.query(volumes_and_paths=scope, limit=limit,
+                                      sort_by=sort_by, **query_args)
+    
+    tasks = [asyncio.ensure_future(run(scope)) for scope in volumes_and_paths]
+    merged: List[StarfishEntry] = []
+    try:
+        for task in tasks:
+            merged.extend(await task)
+            if not sort_by and limit and len(merged) >= limit:
+                break
+    finally:
+        # Cancelling a finished task is a no-op; wait for the rest to unwind
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    if sort_by:
+        merged = _sort_entries(merged, sort_by)
+    return merged[:limit] if limit else merged
+
 
 async def execute_starfish_query(client: StarfishClient, arguments: Dict[str, Any]) -> dict:
-    """Execute comprehensive Starfish query with all available filters."""
+    """Execute comprehensive Starfish query with all available filters.
+    
+    Returns the MCP tool result: a single text item holding the JSON response.
+    """
     
     # Extract execution parameters
-    volumes_and_paths = arguments.get("volumes_and_paths", [])
-    limit = arguments.get("limit", 100)
-    sort_by = arguments.get("sort_by")
-    format_fields = arguments.get("format_fields")
-    use_async = arguments.get("use_async", False)
+    options = QueryOptions.from_arguments(arguments)
+    volumes_and_paths = options.volumes_and_paths
+    limit = options.limit
+    sort_by = options.sort_by
+    format_fields = options.format_fields
+    # The async API needs a scope; unscoped queries always run synchronously
+    use_async = bool(volumes_and_paths) and (
+        options.use_async or limit > ASYNC_LIMIT_THRESHOLD
+    )
     
-    # Build query string
-    query = build_starfish_query(arguments)
+    # Build query string and the filters_applied metadata together
+    query, filters_applied = build_starfish_query_with_metadata(arguments)
     
     logger.info(
         "Executing comprehensive Starfish query",
@@ -35,13 +256,25 @@ async def execute_starfish_query(client: StarfishClient, arguments: Dict[str, An
     )
     
     # Execute query
-    if use_async and volumes_and_paths:
+    use_cache = not options.no_cache
+    if use_async:
         response = await client.async_query(
             volumes_and_paths=volumes_and_paths,
             queries=[query] if query else [],
             format_fields=format_fields,
             limit=limit,
-            sort_by=sort_by
+            sort_by=sort_by,
+            use_cache=use_cache
+        )
+    elif len(volumes_and_paths) > 1:
+        response = await _query_each_scope(
+            client,
+            volumes_and_paths,
+            limit,
+            query=query,
+            format_fields=format_fields,
+            sort_by=sort_by,
+            use_cache=use_cache
         )
     else:
         volumes_param = volumes_and_paths[0] if volumes_and_paths else None
@@ -50,84 +283,23 @@ async def execute_starfish_query(client: StarfishClient, arguments: Dict[str, An
             volumes_and_paths=volumes_param,
             format_fields=format_fields,
             limit=limit,
-            sort_by=sort_by
+            sort_by=sort_by,
+            use_cache=use_cache
         )
     
+    # Never format more than limit entries, whatever the client returned
+    if limit and len(response) > limit:
+        response = response[:limit]
+    
     # Convert to JSON result
-    results = []
-    for entry in response:
-        result = {
-            "id": entry.id,
-            "filename": entry.filename,
-            "parent_path": entry.parent_path,
-            "full_path": entry.full_path,
-            "volume": entry.volume,
-            "size": entry.size,
-            "type": "file" if entry.is_file else "directory",
-            "uid": entry.uid,
-            "gid": entry.gid,
-            "mode": entry.mode
-        }
-        
-        # Add time information if available
-        if entry.create_time:
-            result["create_time"] = entry.create_time.isoformat()
-        if entry.modify_time:
-            result["modify_time"] = entry.modify_time.isoformat()
-        if entry.access_time:
-            result["access_time"] = entry.access_time.isoformat()
-        
-        # Add tags if available
-        if entry.all_tags:
-            result["tags"] = entry.all_tags
-        
-        # Add zones if available
-        if entry.zones:
-            result["zones"] = [{"id": z.id, "name": z.name, "relative_path": z.relative_path} for z in entry.zones]
-        
-        # Add aggregation data for directories
-        if hasattr(entry, 'aggrs') and entry.aggrs:
-            result["local_aggregates"] = entry.aggrs
-        if hasattr(entry, 'rec_aggrs') and entry.rec_aggrs:
-            result["recursive_aggregates"] = entry.rec_aggrs
-        
-        # Check for extra fields that might contain aggregation data
-        if hasattr(entry, '__pydantic_extra__') and entry.__pydantic_extra__:
-            extra_fields = entry.__pydantic_extra__
-            if 'aggrs' in extra_fields:
-                result["local_aggregates"] = extra_fields['aggrs']
-            if 'rec_aggrs' in extra_fields:
-                result["recursive_aggregates"] = extra_fields['rec_aggrs']
-            if 'local_aggr' in extra_fields:
-                result["local_aggregates_alt"] = extra_fields['local_aggr']
-            
-        # Add additional directory metadata
-        if entry.entries_count is not None:
-            result["entries_count"] = entry.entries_count
-        if entry.logical_size is not None:
-            result["logical_size"] = entry.logical_size
-        if entry.physical_size is not None:
-            result["physical_size"] = entry.physical_size
-        if entry.cost is not None:
-            result["cost"] = entry.cost
-        if entry.depth is not None:
-            result["depth"] = entry.depth
-        
-        results.append(result)
-    
-    return {
-        "content": [
-            {
-                "type": "text",
-                "text": json.dumps({
-                    "query": query,
-                    "filters_applied": extract_query_metadata(arguments),
-                    "search_scope": volumes_and_paths,
-                    "use_async": use_async,
-                    "total_found": len(results),
-                    "limit": limit,
-                    "results": results
-                }, indent=2)
-            }
-        ]
-    }
+    results = [_format_entry(entry) for entry in response]
+    
+    return text_result({
+        "query": query,
+        "filters_applied": filters_applied,
+        "search_scope": volumes_and_paths,
+        "use_async": use_async,
+        "total_found": len(results),
+        "limit": limit,
+        "results": results
+    }, options.pretty)
@@ -1,19 +1,25 @@
 """Test configuration and fixtures."""
 
 import pytest
+import pytest_asyncio
 import json
 import os
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List
 from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timedelta
 
+from starfish_mcp.client import StarfishClient
 from starfish_mcp.config import StarfishConfig
 from starfish_mcp.models import StarfishEntry, VolumeInfo, StarfishQueryResponse, StarfishZoneDetails
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_config() -> StarfishConfig:
-    """Mock configuration for testing."""
+    """Mock configuration for testing.
+    
+    Shared by the whole session; tests that need different settings take a
+    model_copy(update=...) rather than modifying it.
+    """
     return StarfishConfig(
         api_endpoint="https://mock-starfish.example.com/api",
         username="mock-user",
@@ -31,6 +37,23 @@ def mock_config() -> StarfishConfig:
     )
 
 
+@pytest_asyncio.fixture
+async def client_factory():
+    """Factory for StarfishClients with an open session, closed at teardown."""
+    created: List[StarfishClient] = []
+    
+    async def make(config: StarfishConfig) -> StarfishClient:
+        client = StarfishClient(config)
+        await client.__aenter__()
+        created.append(client)
+        return client
+    
+    yield make
+    
+    for client in created:
+        await client.__aexit__(None, None, None)
+
+
 @pytest.fixture
 def sample_starfish_entries() -> List[Dict[str, Any]]:
     """Sample Starfish entry data for testing."""
@@ -118,6 +141,51 @@ def sample_starfish_entries() -> List[Dict[str, Any]]:
     ]
 
 
+# Shape shared by every generated entry; make_starfish_entries copies it and
+# fills in the per-entry fields
+_ENTRY_PROTOTYPE: Dict[str, Any] = {
+    "_id": 0,
+    "fn": "",
+    "parent_path": "/generated",
+    "full_path": "",
+    "type": 32768,
+    "size": 0,
+    "mode": "644",
+    "uid": 1000,
+    "gid": 1000,
+    "ct": 0,
+    "mt": 0,
+    "at": 0,
+    "volume": "storage1",
+    "ino": 0,
+    "tags_explicit": "generated",
+    "tags_inherited": "Collections:TestData",
+}
+
+
+@pytest.fixture
+def make_starfish_entries() -> Callable[[int], List[Dict[str, Any]]]:
+    """Factory for n synthetic Starfish entries, for tests that need volume."""
+    base_time = int(datetime.now().timestamp())
+    
+    def make(n: int) -> List[Dict[str, Any]]:
+        entries = []
+        for i in range(n):
+            entry = _ENTRY_PROTOTYPE.copy()
+            entry["_id"] = 100000 + i
+            entry["fn"] = f"file_{i}.txt"
+            entry["full_path"] = f"/generated/file_{i}.txt"
+            entry["size"] = i * 1024
+            entry["ct"] = base_time - 86400 - i
+            entry["mt"] = base_time - 3600 - i
+            entry["at"] = base_time - 60 - i
+            entry["ino"] = 200000 + i
+            entries.append(entry)
+        return entries
+    
+    return make
+
+
 @pytest.fixture
 def sample_volumes() -> List[Dict[str, Any]]:
     """Sample volume data for testing."""
@@ -275,9 +343,25 @@ class MockStarfishClient:
         self.sample_zones = sample_zones
         self.request_log: List[Dict[str, Any]] = []
         
+        # Validated entries, built once so query() only has to slice them
+        self._entries = [StarfishEntry(**entry) for entry in sample_entries]
+        
+        # Lowercased fields used by _filter_entries, computed once per client
+        self._index = [
+            (
+                validated,
+                entry["fn"].lower(),
+                (entry.get("tags_explicit", "") + "," + entry.get("tags_inherited", "")).lower(),
+                entry.get("parent_path", "").lower(),
+                entry["type"] == 32768
+            )
+            for validated, entry in zip(self._entries, sample_entries)
+        ]
+        
     async def query(self, query: str, format_fields: str = None, 
                    limit: int = 1000, sort_by: str = None,
-                   volumes_and_paths: str = None) -> List[StarfishEntry]:
+                   volumes_and_paths: str = None,
+                   use_cache: bool = True) -> List[StarfishEntry]:
         """Mock query method."""
         self.request_log.append({
             "method": "query",
@@ -289,9 +373,7 @@ class MockStarfishClient:
         })
         
         # Filter entries based on query
-        filtered_entries = self._filter_entries(query)
-        
-        return [StarfishEntry(**entry) for entry in filtered_entries]
+        return self._filter_entries(query)
     
     async def list_volumes(self) -> List[VolumeInfo]:
         """Mock list volumes method."""
@@ -319,38 +401,24 @@ class MockStarfishClient:
         self.request_log.append({"method": "list_zones"})
         return [StarfishZoneDetails(**zone) for zone in self.sample_zones]
     
-    def _filter_entries(self, query: str) -> List[Dict[str, Any]]:
+    def _filter_entries(self, query: str) -> List[StarfishEntry]:
         """Filter entries based on query string."""
         if not query:
-            return self.sample_entries.copy()
+            return self._entries.copy()
         
         filtered = []
         query_lower = query.lower()
+        match_foo = "foo" in query_lower
+        tag_part = query_lower.split("tag=", 1)[1].split(None, 1)[0] if "tag=" in query_lower else None
+        match_baz = "/baz" in query_lower
+        match_files = "type=f" in query_lower
         
-        for entry in self.sample_entries:
-            # Check filename match
-            if "foo" in query_lower and "foo" in entry["fn"].lower():
-                filtered.append(entry)
-                continue
-                
-            # Check tag match
-            if "tag=" in query_lower:
-                tag_part = query_lower.split("tag=")[1].split()[0]
-                all_tags = (entry.get("tags_explicit", "") + "," + 
-                           entry.get("tags_inherited", "")).lower()
-                if tag_part in all_tags:
-                    filtered.append(entry)
-                    continue
-            
-            # Check path match
-            if "/baz" in query_lower and "/baz" in entry.get("parent_path", "").lower():
+        for entry, fn, all_tags, parent_path, is_file in self._index:
+            if ((match_foo and "foo" in fn)                           # filename match
+                    or (tag_part is not None and tag_part in all_tags)  # tag match
+                    or (match_baz and "/baz" in parent_path)          # path match
+                    or (match_files and is_file)):                    # type filter
                 filtered.append(entry)
-                continue
-                
-            # Check type filter
-            if "type=f" in query_lower and entry["type"] == 32768:
-                filtered.append(entry)
-                continue
         
         return filtered
 
@@ -368,7 +436,7 @@ def mock_starfish_client(sample_starfish_entries, sample_volumes,
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def integration_config() -> StarfishConfig:
     """Configuration for integration tests (uses real Starfish if available)."""
     # Check if integration test environment variables are set
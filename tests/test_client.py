@@ -1,11 +1,12 @@
 """Tests for Starfish client functionality."""
 
 import pytest
+import pytest_asyncio
 import asyncio
 from unittest.mock import AsyncMock, patch
 from datetime import datetime, timedelta
 
-from starfish_mcp.client import StarfishClient, TokenManager
+from starfish_mcp.client import DEFAULT_QUERY_FORMAT, StarfishClient, TokenManager
 from starfish_mcp.models import StarfishError
 
 
@@ -30,53 +31,52 @@ async def test_starfish_client_creation(mock_config):
 
 
 @pytest.mark.asyncio
-async def test_client_timeout_handling(mock_config):
-    """Test that client properly handles timeout in requests."""
+async def test_client_session_does_not_cap_per_host(mock_config):
+    """Test that the idle-connection settings don't cap concurrent requests."""
     client = StarfishClient(mock_config)
+    async with client:
+        connector = client.session.connector
+        assert connector.limit_per_host == 0
+    assert client.session.closed
+
+
+@pytest_asyncio.fixture
+async def timeout_client(client_factory, mock_config):
+    """StarfishClient with an open session and a stubbed bearer token."""
+    client = await client_factory(mock_config)
+    client.token_manager.get_token = AsyncMock(return_value="test-token")
+    return client
+
+
+@pytest.mark.asyncio
+async def test_client_timeout_handling(timeout_client, monkeypatch):
+    """Test that client properly handles timeout in requests."""
+    # Make the session's request raise TimeoutError
+    monkeypatch.setattr(timeout_client.session, "request", AsyncMock(side_effect=asyncio.TimeoutError()))
     
-    # Mock aiohttp to raise TimeoutError
-    with patch('aiohttp.ClientSession.request') as mock_request:
-        mock_request.side_effect = asyncio.TimeoutError()
-        
-        # Mock token manager
-        with patch.object(client, 'token_manager') as mock_token_manager:
-            mock_token_manager.get_token = AsyncMock(return_value="test-token")
-            
-            with pytest.raises(StarfishError) as exc_info:
-                await client._request("GET", "/test", timeout_seconds=5)
-            
-            assert exc_info.value.code == "REQUEST_TIMEOUT"
-            assert "timed out after 5 seconds" in exc_info.value.message
+    with pytest.raises(StarfishError) as exc_info:
+        await timeout_client._request("GET", "/test", timeout_seconds=5)
+    
+    assert exc_info.value.code == "REQUEST_TIMEOUT"
+    assert "timed out after 5 seconds" in exc_info.value.message
 
 
 @pytest.mark.asyncio
-async def test_client_timeout_custom_value(mock_config):
+async def test_client_timeout_custom_value(timeout_client, monkeypatch):
     """Test client timeout with custom timeout value."""
-    client = StarfishClient(mock_config)
+    # Make the session's request raise TimeoutError
+    monkeypatch.setattr(timeout_client.session, "request", AsyncMock(side_effect=asyncio.TimeoutError()))
     
-    # Mock aiohttp to raise TimeoutError
-    with patch('aiohttp.ClientSession.request') as mock_request:
-        mock_request.side_effect = asyncio.TimeoutError()
-        
-        # Mock token manager
-        with patch.object(client, 'token_manager') as mock_token_manager:
-            mock_token_manager.get_token = AsyncMock(return_value="test-token")
-            
-            with pytest.raises(StarfishError) as exc_info:
-                await client._request("GET", "/test", timeout_seconds=10)
-            
-            assert exc_info.value.code == "REQUEST_TIMEOUT"
-            assert "timed out after 10 seconds" in exc_info.value.message
+    with pytest.raises(StarfishError) as exc_info:
+        await timeout_client._request("GET", "/test", timeout_seconds=10)
+    
+    assert exc_info.value.code == "REQUEST_TIMEOUT"
+    assert "timed out after 10 seconds" in exc_info.value.message
 
 
 @pytest.mark.asyncio
-async def test_timeout_implementation_correctness(mock_config):
+async def test_timeout_implementation_correctness(timeout_client, monkeypatch):
     """Test that the timeout implementation doesn't break normal requests."""
-    import aiohttp
-    from unittest.mock import AsyncMock
-    
-    client = StarfishClient(mock_config)
-    
     # Mock successful response
     mock_response = AsyncMock()
     mock_response.status = 200
@@ -85,27 +85,17 @@ async def test_timeout_implementation_correctness(mock_config):
     mock_response.__aenter__ = AsyncMock(return_value=mock_response)
     mock_response.__aexit__ = AsyncMock(return_value=None)
     
-    # Properly mock the actual async function
-    async def mock_request_func(*args, **kwargs):
-        return mock_response
+    monkeypatch.setattr(timeout_client.session, "request", AsyncMock(return_value=mock_response))
+    
+    # This should work without any timeout issues
+    result = await timeout_client._request("GET", "/test")
     
-    with patch('aiohttp.ClientSession.request', side_effect=mock_request_func):
-        with patch.object(client, 'token_manager') as mock_token_manager:
-            mock_token_manager.get_token = AsyncMock(return_value="test-token")
-            
-            # This should work without any timeout issues
-            result = await client._request("GET", "/test")
-            
-            assert result == {"test": "data"}
+    assert result == {"test": "data"}
 
 
 @pytest.mark.asyncio
-async def test_timeout_with_slow_response(mock_config):
+async def test_timeout_with_slow_response(timeout_client, monkeypatch):
     """Test timeout with actual slow response simulation."""
-    import asyncio
-    
-    client = StarfishClient(mock_config)
-    
     async def slow_request(*args, **kwargs):
         await asyncio.sleep(2)  # Simulate slow response
         mock_response = AsyncMock()
@@ -116,13 +106,167 @@ async def test_timeout_with_slow_response(mock_config):
         mock_response.__aexit__ = AsyncMock(return_value=None)
         return mock_response
     
-    with patch('aiohttp.ClientSession.request', side_effect=slow_request):
-        with patch.object(client, 'token_manager') as mock_token_manager:
-            mock_token_manager.get_token = AsyncMock(return_value="test-token")
-            
-            # Should timeout after 1 second
-            with pytest.raises(StarfishError) as exc_info:
-                await client._request("GET", "/test", timeout_seconds=1)
-            
-            assert exc_info.value.code == "REQUEST_TIMEOUT"
-            assert "timed out after 1 seconds" in exc_info.value.message
\ No newline at end of file
+    monkeypatch.setattr(timeout_client.session, "request", slow_request)
+    
+    # Should timeout after 1 second
+    with pytest.raises(StarfishError) as exc_info:
+        await timeout_client._request("GET", "/test", timeout_seconds=1)
+    
+    assert exc_info.value.code == "REQUEST_TIMEOUT"
+    assert "timed out after 1 seconds" in exc_info.value.message
+
+
+@pytest.mark.asyncio
+async def test_list_volumes_uses_cache(mock_config, sample_volumes):
+    """Test that volume listings are reused within the cache TTL."""
+    client = StarfishClient(mock_config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_volumes)) as mock_request:
+        first = await client.list_volumes()
+        second = await client.list_volumes()
+        
+        assert mock_request.await_count == 1
+        assert [v.vol for v in second] == [v.vol for v in first]
+        
+        # Clearing the cache forces a refetch
+        client.clear_cache()
+        await client.list_volumes()
+        assert mock_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_listing_cache_disabled_with_zero_ttl(mock_config, sample_zones):
+    """Test that a TTL of 0 disables listing caching."""
+    config = mock_config.model_copy(update={"list_cache_ttl_seconds": 0})
+    client = StarfishClient(config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_zones)) as mock_request:
+        await client.list_zones()
+        await client.list_zones()
+        
+        assert mock_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_query_default_format(mock_config, sample_starfish_entries):
+    """Test that query requests the default field set unless one is given."""
+    client = StarfishClient(mock_config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_starfish_entries)) as mock_request:
+        await client.query("name=foo")
+        assert mock_request.call_args.kwargs["params"]["format"] == DEFAULT_QUERY_FORMAT
+        
+        await client.query("name=foo", format_fields="fn size")
+        assert mock_request.call_args.kwargs["params"]["format"] == "fn size"
+
+
+@pytest.mark.asyncio
+async def test_query_results_are_cached(mock_config, sample_starfish_entries):
+    """Test that identical queries reuse a cached result within the TTL."""
+    config = mock_config.model_copy(update={"query_cache_ttl_seconds": 30})
+    client = StarfishClient(config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_starfish_entries)) as mock_request:
+        first = await client.query("name=foo", limit=10)
+        second = await client.query("name=foo", limit=10)
+        assert mock_request.await_count == 1
+        assert [e.id for e in second] == [e.id for e in first]
+        
+        # Different parameters are a different cache entry
+        await client.query("name=foo", limit=20)
+        assert mock_request.await_count == 2
+        
+        # use_cache=False always goes to the API
+        await client.query("name=foo", limit=10, use_cache=False)
+        assert mock_request.await_count == 3
+        
+        client.clear_cache()
+        await client.query("name=foo", limit=10)
+        assert mock_request.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_query_cache_disabled_with_zero_ttl(mock_config, sample_starfish_entries):
+    """Test that a query cache TTL of 0 disables result caching."""
+    config = mock_config.model_copy(update={"query_cache_ttl_seconds": 0})
+    client = StarfishClient(config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_starfish_entries)) as mock_request:
+        await client.query("name=foo")
+        await client.query("name=foo")
+        
+        assert mock_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_request(mock_config, sample_starfish_entries):
+    """Test that identical queries in flight at the same time send one request."""
+    config = mock_config.model_copy(update={"query_cache_ttl_seconds": 0})
+    client = StarfishClient(config)
+    release = asyncio.Event()
+    
+    async def slow_request(*args, **kwargs):
+        await release.wait()
+        return sample_starfish_entries
+    
+    with patch.object(client, '_request', AsyncMock(side_effect=slow_request)) as mock_request:
+        pending = [asyncio.ensure_future(client.query("name=foo", limit=10)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*pending)
+        
+        assert mock_request.await_count == 1
+        assert all(len(r) == len(sample_starfish_entries) for r in results)
+        # Each caller gets its own list
+        assert results[0] is not results[1]
+        
+        # Nothing is left in flight, so the next query is sent again
+        await client.query("name=foo", limit=10)
+        assert mock_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_query_cancelled_with_its_last_caller(mock_config):
+    """Test that a shared request is cancelled only when no caller waits for it."""
+    client = StarfishClient(mock_config)
+    cancelled = asyncio.Event()
+    
+    async def hanging_request(*args, **kwargs):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    with patch.object(client, '_request', AsyncMock(side_effect=hanging_request)):
+        first = asyncio.ensure_future(client.query("name=foo"))
+        second = asyncio.ensure_future(client.query("name=foo"))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+        
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=5)
+        assert client._inflight_queries == {}
+
+
+@pytest.mark.asyncio
+async def test_query_cache_evicts_least_recently_used(mock_config, sample_starfish_entries, monkeypatch):
+    """Test that the query cache is bounded."""
+    monkeypatch.setattr("starfish_mcp.client.QUERY_CACHE_MAX_ENTRIES", 2)
+    config = mock_config.model_copy(update={"query_cache_ttl_seconds": 30})
+    client = StarfishClient(config)
+    
+    with patch.object(client, '_request', AsyncMock(return_value=sample_starfish_entries)) as mock_request:
+        await client.query("name=a")
+        await client.query("name=b")
+        await client.query("name=a")  # hit; b is now least recently used
+        await client.query("name=c")  # evicts b
+        assert mock_request.await_count == 3
+        
+        await client.query("name=a")
+        assert mock_request.await_count == 3
+        await client.query("name=b")
+        assert mock_request.await_count == 4
@@ -1,112 +1,81 @@
 """Tests for configuration management."""
 
-import pytest
 import os
-import tempfile
+import pytest
+import re
 from pathlib import Path
 from starfish_mcp.config import StarfishConfig, load_config
 
+# Expected validation error messages, compiled once for pytest.raises(match=...)
+_RE_API_REQ = re.compile("API endpoint is required")
+_RE_USER_REQ = re.compile("Username is required")
+_RE_PASSWORD_REQ = re.compile("Password is required")
+_RE_TLS_VERSION = re.compile(re.escape("TLS version must be '1.2' or '1.3'"))
+_RE_LIST_CACHE_TTL = re.compile("List cache TTL must be non-negative")
+_RE_QUERY_CACHE_TTL = re.compile("Query cache TTL must be non-negative")
+_RE_LOG_LEVEL = re.compile("Log level must be one of")
+
+# Minimal valid StarfishConfig arguments; tests override single fields
+_VALID_KW = {
+    "api_endpoint": "https://starfish.example.com/api",
+    "username": "test-user",
+    "password": "test-password"
+}
+
 
 def test_starfish_config_validation():
     """Test StarfishConfig validation."""
     # Valid config
-    config = StarfishConfig(
-        api_endpoint="https://starfish.example.com/api",
-        username="test-user",
-        password="test-password"
-    )
+    config = StarfishConfig(**_VALID_KW)
     assert config.api_endpoint == "https://starfish.example.com/api"
     assert config.username == "test-user"
     assert config.password == "test-password"
 
 
-def test_api_endpoint_validation():
-    """Test API endpoint validation."""
-    # Valid endpoints
-    config1 = StarfishConfig(
-        api_endpoint="https://starfish.example.com/api/",  # Trailing slash should be removed
-        username="test-user",
-        password="test-password"
-    )
-    assert config1.api_endpoint == "https://starfish.example.com/api"
-    
-    # Empty endpoint should fail
-    with pytest.raises(ValueError, match="API endpoint is required"):
-        StarfishConfig(
-            api_endpoint="",
-            username="test-user", 
-            password="test-password"
-        )
-
-
-def test_username_password_validation():
-    """Test username and password validation."""
-    # Empty username should fail
-    with pytest.raises(ValueError, match="Username is required"):
-        StarfishConfig(
-            api_endpoint="https://starfish.example.com/api",
-            username="",
-            password="test-password"
-        )
-    
-    # Empty password should fail
-    with pytest.raises(ValueError, match="Password is required"):
-        StarfishConfig(
-            api_endpoint="https://starfish.example.com/api",
-            username="test-user",
-            password=""
-        )
-
-
-def test_tls_version_validation():
-    """Test TLS version validation."""
-    # Valid versions
-    config1 = StarfishConfig(
-        api_endpoint="https://starfish.example.com/api",
-        username="test-user",
-        password="test-password",
-        tls_min_version="1.2"
-    )
-    assert config1.tls_min_version == "1.2"
-    
-    config2 = StarfishConfig(
-        api_endpoint="https://starfish.example.com/api",
-        username="test-user",
-        password="test-password",
-        tls_min_version="1.3"
-    )
-    assert config2.tls_min_version == "1.3"
-    
-    # Invalid version should fail
-    with pytest.raises(ValueError, match="TLS version must be '1.2' or '1.3'"):
-        StarfishConfig(
-            api_endpoint="https://starfish.example.com/api",
-            username="test-user",
-            password="test-password",
-            tls_min_version="1.1"
-        )
-
-
-def test_log_level_validation():
-    """Test log level validation."""
-    # Valid levels
-    for level in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
-        config = StarfishConfig(
-            api_endpoint="https://starfish.example.com/api",
-            username="test-user",
-            password="test-password",
-            log_level=level.lower()  # Should be converted to uppercase
-        )
-        assert config.log_level == level
-    
-    # Invalid level should fail
-    with pytest.raises(ValueError, match="Log level must be one of"):
-        StarfishConfig(
-            api_endpoint="https://starfish.example.com/api",
-            username="test-user",
-            password="test-password",
-            log_level="INVALID"
-        )
+@pytest.mark.parametrize("endpoint", [
+    "https://starfish.example.com/api",
+    "https://starfish.example.com/api/",  # Trailing slash should be removed
+])
+def test_api_endpoint_validation(endpoint):
+    """Test API endpoint normalization."""
+    config = StarfishConfig(**{**_VALID_KW, "api_endpoint": endpoint})
+    assert config.api_endpoint == "https://starfish.example.com/api"
+
+
+@pytest.mark.parametrize("version", ["1.2", "1.3"])
+def test_tls_version_validation(version):
+    """Test valid TLS versions."""
+    config = StarfishConfig(**_VALID_KW, tls_min_version=version)
+    assert config.tls_min_version == version
+
+
+@pytest.mark.parametrize("field", ["list_cache_ttl_seconds", "query_cache_ttl_seconds"])
+def test_cache_ttl_validation(field):
+    """Test that a cache TTL of 0 (caching disabled) is accepted."""
+    config = StarfishConfig(**_VALID_KW, **{field: 0})
+    assert getattr(config, field) == 0
+
+
+@pytest.mark.parametrize("level", ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+def test_log_level_validation(level):
+    """Test valid log levels."""
+    config = StarfishConfig(**_VALID_KW, log_level=level.lower())  # Should be converted to uppercase
+    assert config.log_level == level
+
+
+@pytest.mark.parametrize("field, value, match", [
+    ("api_endpoint", "", _RE_API_REQ),
+    ("username", "", _RE_USER_REQ),
+    ("password", "", _RE_PASSWORD_REQ),
+    ("tls_min_version", "1.1", _RE_TLS_VERSION),
+    ("list_cache_ttl_seconds", -1, _RE_LIST_CACHE_TTL),
+    ("query_cache_ttl_seconds", -1, _RE_QUERY_CACHE_TTL),
+    ("log_level", "INVALID", _RE_LOG_LEVEL),
+])
+def test_invalid_config_values(field, value, match):
+    """Test that invalid configuration values are rejected."""
+    with pytest.raises(ValueError, match=match):
+        StarfishConfig(**{**_VALID_KW, field: value})
 
 
 def test_load_config_from_env():
@@ -126,37 +95,25 @@ def test_load_config_from_env():
         "LOG_LEVEL": "debug"
     }
     
-    # Temporarily set environment variables
-    old_values = {}
-    for key, value in env_vars.items():
-        old_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in env_vars.items():
+            mp.setenv(key, value)
         config = load_config()
-        
-        assert config.api_endpoint == "https://test.starfish.com/api"
-        assert config.username == "env-user"
-        assert config.password == "env-password"
-        assert config.token_timeout_secs == 3600
-        assert config.file_server_url == "https://test-files.starfish.com"
-        assert config.cache_ttl_hours == 2
-        assert config.collections_refresh_interval_minutes == 15
-        assert config.http_timeout_seconds == 45
-        assert config.tls_insecure_skip_verify is True
-        assert config.tls_min_version == "1.3"
-        assert config.log_level == "DEBUG"
-        
-    finally:
-        # Restore original environment variables
-        for key, old_value in old_values.items():
-            if old_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = old_value
-
-
-def test_load_config_from_env_file():
+    
+    assert config.api_endpoint == "https://test.starfish.com/api"
+    assert config.username == "env-user"
+    assert config.password == "env-password"
+    assert config.token_timeout_secs == 3600
+    assert config.file_server_url == "https://test-files.starfish.com"
+    assert config.cache_ttl_hours == 2
+    assert config.collections_refresh_interval_minutes == 15
+    assert config.http_timeout_seconds == 45
+    assert config.tls_insecure_skip_verify is True
+    assert config.tls_min_version == "1.3"
+    assert config.log_level == "DEBUG"
+
+
+def test_load_config_from_env_file(tmp_path):
     """Test loading configuration from .env file."""
     env_content = """
 # Starfish MCP Server Configuration
@@ -167,71 +124,74 @@ STARFISH_FILE_SERVER_URL=https://file-server.starfish.com
 CACHE_TTL_HOURS=3
 LOG_LEVEL=ERROR
 """
+    env_file = tmp_path / "test.env"
+    env_file.write_text(env_content)
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.env', delete=False) as f:
-        f.write(env_content)
-        env_file_path = f.name
+    # load_dotenv writes into os.environ and never overrides variables that
+    # are already set, so each key is cleared first for the file's values to
+    # win. mp only records variables that exist, so setting each key before
+    # deleting it is what makes mp remove the file's values afterwards.
+    with pytest.MonkeyPatch.context() as mp:
+        for line in env_content.splitlines():
+            if "=" in line and not line.startswith("#"):
+                key = line.split("=", 1)[0]
+                mp.setenv(key, "")
+                mp.delenv(key)
+        config = load_config(str(env_file))
     
-    try:
-        config = load_config(env_file_path)
-        
-        assert config.api_endpoint == "https://file.starfish.com/api"
-        assert config.username == "file-user"
-        assert config.password == "file-password"
-        assert config.file_server_url == "https://file-server.starfish.com"
-        assert config.cache_ttl_hours == 3
-        assert config.log_level == "ERROR"
-        
-    finally:
-        os.unlink(env_file_path)
-
-
-def test_load_config_defaults():
-    """Test configuration defaults when environment variables are not set."""
-    # Clear relevant environment variables
+    # The file's values don't outlive the test
+    assert os.environ.get("STARFISH_USERNAME") != "file-user"
+    assert config.api_endpoint == "https://file.starfish.com/api"
+    assert config.username == "file-user"
+    assert config.password == "file-password"
+    assert config.file_server_url == "https://file-server.starfish.com"
+    assert config.cache_ttl_hours == 3
+    assert config.log_level == "ERROR"
+
+
+@pytest.fixture(scope="session")
+def default_config(tmp_path_factory) -> StarfishConfig:
+    """Configuration loaded with only the required environment variables set.
+    
+    Loaded once per session; the environment and working directory are
+    restored as soon as it has been built.
+    """
+    # Relevant environment variables to clear
     env_vars_to_clear = [
         "STARFISH_API_ENDPOINT", "STARFISH_USERNAME", "STARFISH_PASSWORD", "STARFISH_TOKEN_TIMEOUT_SECS", "STARFISH_FILE_SERVER_URL",
-        "CACHE_TTL_HOURS", "COLLECTIONS_REFRESH_INTERVAL_MINUTES", "HTTP_TIMEOUT_SECONDS",
+        "CACHE_TTL_HOURS", "COLLECTIONS_REFRESH_INTERVAL_MINUTES", "LIST_CACHE_TTL_SECONDS", "QUERY_CACHE_TTL_SECONDS", "HTTP_TIMEOUT_SECONDS",
         "MAX_IDLE_CONNECTIONS", "MAX_IDLE_CONNECTIONS_PER_HOST", "TLS_INSECURE_SKIP_VERIFY",
         "TLS_MIN_VERSION", "LOG_LEVEL"
     ]
     
-    old_values = {}
-    for var in env_vars_to_clear:
-        old_values[var] = os.environ.get(var)
-        os.environ.pop(var, None)
-    
-    # Set required environment variables
-    os.environ["STARFISH_API_ENDPOINT"] = "https://required.starfish.com/api"
-    os.environ["STARFISH_USERNAME"] = "required-user"
-    os.environ["STARFISH_PASSWORD"] = "required-password"
-    
-    # Change to a temporary directory to avoid loading local .env file
-    import tempfile
-    original_cwd = os.getcwd()
-    
-    try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            os.chdir(temp_dir)
-            config = load_config()
-            
-            # Check defaults
-            assert config.token_timeout_secs == 57600
-            assert config.cache_ttl_hours == 1
-            assert config.collections_refresh_interval_minutes == 10
-            assert config.http_timeout_seconds == 30
-            assert config.max_idle_connections == 100
-            assert config.max_idle_connections_per_host == 10
-            assert config.tls_insecure_skip_verify is False
-            assert config.tls_min_version == "1.2"
-            assert config.log_level == "INFO"
-            assert config.file_server_url is None
+    with pytest.MonkeyPatch.context() as mp:
+        for var in env_vars_to_clear:
+            mp.delenv(var, raising=False)
         
-    finally:
-        os.chdir(original_cwd)
-        # Restore original environment variables
-        for var, old_value in old_values.items():
-            if old_value is None:
-                os.environ.pop(var, None)
-            else:
-                os.environ[var] = old_value
+        # Set required environment variables
+        mp.setenv("STARFISH_API_ENDPOINT", "https://required.starfish.com/api")
+        mp.setenv("STARFISH_USERNAME", "required-user")
+        mp.setenv("STARFISH_PASSWORD", "required-password")
+        
+        # Change to an empty directory to avoid loading local .env file
+        mp.chdir(tmp_path_factory.mktemp("config-defaults"))
+        return load_config()
+
+
+@pytest.mark.parametrize("field, expected", [
+    ("token_timeout_secs", 57600),
+    ("cache_ttl_hours", 1),
+    ("collections_refresh_interval_minutes", 10),
+    ("list_cache_ttl_seconds", 30),
+    ("query_cache_ttl_seconds", 0),
+    ("http_timeout_seconds", 30),
+    ("max_idle_connections", 100),
+    ("max_idle_connections_per_host", 10),
+    ("tls_insecure_skip_verify", False),
+    ("tls_min_version", "1.2"),
+    ("log_level", "INFO"),
+    ("file_server_url", None),
+])
+def test_load_config_defaults(default_config, field, expected):
+    """Test configuration defaults when environment variables are not set."""
+    assert getattr(default_config, field) == expected
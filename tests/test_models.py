@@ -2,26 +2,30 @@
 
 import pytest
 from datetime import datetime
+from types import MappingProxyType
 from starfish_mcp.models import StarfishEntry, VolumeInfo, StarfishQueryResponse, StarfishTagsResponse
 
+# Minimal file entry; tests spread it and add or override what they need
+_BASE_ENTRY = MappingProxyType({
+    "_id": 12345,
+    "fn": "test_file.txt",
+    "type": 32768,
+    "size": 1024,
+    "volume": "storage1",
+})
+
 
 def test_starfish_entry_basic_properties():
     """Test basic StarfishEntry properties."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
+    entry = StarfishEntry(**{
+        **_BASE_ENTRY,
         "parent_path": "/data",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
         "mt": 1640995200,  # 2022-01-01 00:00:00 UTC
         "ct": 1640995100,  # 2022-01-01 00:01:40 UTC
         "at": 1640995300,  # 2022-01-01 00:01:40 UTC
         "tags_explicit": "tag1,tag2,tag3",
         "tags_inherited": "inherited1,inherited2"
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    })
     
     assert entry.id == 12345
     assert entry.filename == "test_file.txt"
@@ -34,18 +38,12 @@ def test_starfish_entry_basic_properties():
 
 def test_starfish_entry_time_properties():
     """Test StarfishEntry time conversion properties."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
+    entry = StarfishEntry(**{
+        **_BASE_ENTRY,
         "mt": 1640995200,  # 2022-01-01 00:00:00 UTC
         "ct": 1640995100,  # 2021-12-31 23:58:20 UTC
         "at": 1640995300,  # 2022-01-01 00:01:40 UTC
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    })
     
     assert entry.modify_time == datetime.fromtimestamp(1640995200)
     assert entry.create_time == datetime.fromtimestamp(1640995100)
@@ -54,34 +52,24 @@ def test_starfish_entry_time_properties():
 
 def test_starfish_entry_tags_properties():
     """Test StarfishEntry tag parsing properties."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
+    entry = StarfishEntry(**{
+        **_BASE_ENTRY,
         "tags_explicit": "tag1,tag2,tag3",
         "tags_inherited": "inherited1,inherited2"
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    })
     
     assert entry.tags_explicit == ["tag1", "tag2", "tag3"]
     assert entry.tags_inherited == ["inherited1", "inherited2"]
     assert entry.all_tags == ["tag1", "tag2", "tag3", "inherited1", "inherited2"]
 
+    # Tags follow the *_str fields, including on copies
+    copy = entry.model_copy(update={"tags_explicit_str": "z"})
+    assert copy.all_tags == ["z", "inherited1", "inherited2"]
+
 
 def test_starfish_entry_empty_tags():
     """Test StarfishEntry with empty or None tags."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    entry = StarfishEntry(**_BASE_ENTRY)
     
     assert entry.tags_explicit == []
     assert entry.tags_inherited == []
@@ -90,17 +78,11 @@ def test_starfish_entry_empty_tags():
 
 def test_starfish_entry_whitespace_tags():
     """Test StarfishEntry tag parsing with whitespace."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
+    entry = StarfishEntry(**{
+        **_BASE_ENTRY,
         "tags_explicit": " tag1 , tag2 , , tag3 ",
         "tags_inherited": "inherited1,  ,inherited2"
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    })
     
     assert entry.tags_explicit == ["tag1", "tag2", "tag3"]
     assert entry.tags_inherited == ["inherited1", "inherited2"]
@@ -108,15 +90,12 @@ def test_starfish_entry_whitespace_tags():
 
 def test_starfish_entry_directory_type():
     """Test StarfishEntry with directory type."""
-    entry_data = {
-        "_id": 12345,
+    entry = StarfishEntry(**{
+        **_BASE_ENTRY,
         "fn": "test_dir",
         "type": 16384,  # Directory type
         "size": 4096,
-        "volume": "storage1",
-    }
-    
-    entry = StarfishEntry(**entry_data)
+    })
     
     assert entry.is_file is False
 
@@ -152,19 +131,10 @@ def test_volume_info():
 
 def test_starfish_query_response():
     """Test StarfishQueryResponse (direct array) model."""
-    entry_data = {
-        "_id": 12345,
-        "fn": "test_file.txt",
-        "type": 32768,
-        "size": 1024,
-        "volume": "storage1",
-    }
-    
     # The API returns an array directly, not wrapped in an object
-    response_data = [entry_data]
+    response_data = [dict(_BASE_ENTRY)]
     
     # Validate that we can parse individual entries
-    from starfish_mcp.models import StarfishEntry
     entries = [StarfishEntry(**item) for item in response_data]
     
     assert len(entries) == 1
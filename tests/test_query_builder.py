@@ -1,7 +1,9 @@
 """Tests specifically for the query builder module."""
 
 import pytest
-from starfish_mcp.tools.query_builder import build_starfish_query, extract_query_metadata
+from starfish_mcp.tools.query_builder import (
+    build_starfish_query, build_starfish_query_with_metadata, extract_query_metadata
+)
 
 
 class TestBasicParameters:
@@ -23,6 +25,11 @@ class TestBasicParameters:
         args = {"name": "^config.*\\.json$"}
         query = build_starfish_query(args)
         assert query == "name-re=^config.*\\.json$"
+        
+        # Regex metacharacters without ^ are anchored
+        for name in ["(a|b).log", "file[0-9]", "x{2}", "a+b", "data?.csv"]:
+            query = build_starfish_query({"name": name})
+            assert query == f"name-re=^{name}"
     
     def test_name_regex(self):
         """Test explicit name regex."""
@@ -401,6 +408,30 @@ class TestComprehensiveQueries:
         
         for part in expected_parts:
             assert part in query
+    
+    def test_parameter_order_is_stable(self):
+        """Test that query parts are always emitted in the same order."""
+        args = {
+            "zone": "prod", "tag_explicit": "archived", "tag": "important",
+            "root_only": True, "children_only": True, "versions": True, "search_all": True,
+            "atime": "+30d", "ctime": "-2h", "mtime": "-1d", "perm": "644",
+            "maxdepth": 5, "depth": 0, "igroupname": "USERS", "iusername": "ALICE",
+            "iname": "TEST", "nlinks": "1", "size": ">1MB", "groupname_regex": "users.*",
+            "groupname": "users", "username_regex": "alice.*", "username": "alice",
+            "gid": 0, "uid": 1001, "inode": 12345, "empty": True, "ext": "txt",
+            "path_regex": "/home.*", "path": "/home", "name_regex": "^test.*",
+            "name": "test", "file_type": "f"
+        }
+        
+        assert build_starfish_query(args) == (
+            "type=f name=test name-re=^test.* ppath=/home ppath-re=^/home.* "
+            "ext=txt empty inode=12345 uid=1001 gid=0 username=alice "
+            "username-re=^alice.* groupname=users groupname-re=^users.* "
+            "size=>1MB nlinks=1 iname=TEST iusername=ALICE igroupname=USERS "
+            "depth=0 maxdepth=5 perm=644 mtime=-1d ctime=-2h atime=+30d "
+            "search-all versions children-only root-only tag=important "
+            "tag-explicit=archived zone=prod"
+        )
 
 
 class TestMetadataExtraction:
@@ -413,7 +444,7 @@ class TestMetadataExtraction:
             "size": ">1MB",
             "uid": 1001,
             "search_all": True,
-            "nonexistent_param": "should_be_none"  # This shouldn't appear
+            "nonexistent_param": "should_be_dropped"  # This shouldn't appear
         }
         
         metadata = extract_query_metadata(args)
@@ -424,10 +455,10 @@ class TestMetadataExtraction:
         assert metadata["uid"] == 1001
         assert metadata["search_all"] is True
         
-        # Check unspecified parameters are None
-        assert metadata["gid"] is None
-        assert metadata["ext"] is None
-        assert metadata["versions"] is None
+        # Check unspecified parameters are omitted
+        assert "gid" not in metadata
+        assert "ext" not in metadata
+        assert "versions" not in metadata
         
         # Check that non-standard parameters are not included
         assert "nonexistent_param" not in metadata
@@ -450,3 +481,16 @@ class TestMetadataExtraction:
         # Verify all parameters are preserved exactly
         for key, expected_value in args.items():
             assert metadata[key] == expected_value, f"Parameter {key} not preserved correctly"
+    
+    def test_combined_build_matches_separate_calls(self):
+        """Test that the one-pass builder agrees with the separate functions."""
+        cases = [
+            {},
+            {"name": "test.txt", "uid": 0, "search_all": False, "limit": 5},
+            {"name_regex": "a.*", "depth": None, "tag": "x", "nonexistent_param": 1},
+        ]
+        
+        for args in cases:
+            query, metadata = build_starfish_query_with_metadata(args)
+            assert query == build_starfish_query(args)
+            assert metadata == extract_query_metadata(args)
@@ -144,7 +144,7 @@ async def test_rate_limiter_sliding_window():
     limiter = RateLimiter(max_queries=2, time_window_seconds=0.2, enabled=True)
     
     # Fill up the window
-    start_time = time.time()
+    start_time = time.perf_counter()
     limiter.check_rate_limit()  # Query 1
     await asyncio.sleep(0.1)    # Wait 0.1 seconds
     limiter.check_rate_limit()  # Query 2
@@ -160,7 +160,7 @@ async def test_rate_limiter_sliding_window():
     allowed, error = limiter.check_rate_limit()
     assert allowed is True
     
-    elapsed = time.time() - start_time
+    elapsed = time.perf_counter() - start_time
     assert elapsed >= 0.2  # Verify we waited long enough
 
 
@@ -196,7 +196,6 @@ def test_rate_limiter_wait_time_accuracy():
     """Test that wait time calculation is reasonably accurate."""
     limiter = RateLimiter(max_queries=1, time_window_seconds=2, enabled=True)
     
-    start_time = time.time()
     limiter.check_rate_limit()  # Use quota
     
     # Check wait time immediately
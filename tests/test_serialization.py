@@ -0,0 +1,52 @@
+"""Tests for tool response serialization helpers."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from starfish_mcp.tools import serialization
+from starfish_mcp.tools.serialization import dumps, text_result
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    """Run each test with and without orjson."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_dumps_is_compact(encoder):
+    """Test that dumps emits compact JSON."""
+    assert dumps({"a": [1, 2], "b": "é"}) == '{"a":[1,2],"b":"é"}'
+
+
+def test_dumps_pretty_matches_stdlib_indent(encoder):
+    """Test that pretty output is indented the same way by both encoders."""
+    obj = {"a": [1, 2], "b": {"c": "é"}}
+    
+    assert dumps(obj, pretty=True) == json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def test_dumps_datetime_matches_isoformat(encoder):
+    """Test that both encoders render naive datetimes like isoformat()."""
+    value = datetime(2022, 1, 1, 12, 30, 5)
+    
+    assert dumps({"t": value}) == f'{{"t":"{value.isoformat()}"}}'
+
+
+def test_dumps_rejects_unknown_types(encoder):
+    """Test that unsupported objects still raise TypeError."""
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def test_text_result_shape(encoder):
+    """Test the MCP result wrapper."""
+    result = text_result({"ok": True})
+    
+    assert result["content"][0]["type"] == "text"
+    assert json.loads(result["content"][0]["text"]) == {"ok": True}
@@ -1,12 +1,15 @@
 """Tests for the new modular tools architecture."""
 
 import pytest
+import asyncio
+import copy
 import json
 from unittest.mock import AsyncMock
 
 from starfish_mcp.tools import StarfishTools
 from starfish_mcp.tools.query_builder import build_starfish_query, extract_query_metadata
 from starfish_mcp.tools.schema import get_starfish_query_schema
+from starfish_mcp.tools.starfish_query import DEFAULT_LIMIT, QueryOptions
 from starfish_mcp.models import StarfishError
 
 
@@ -15,7 +18,7 @@ def test_tools_creation(mock_starfish_client):
     tools = StarfishTools(mock_starfish_client)
     tool_list = tools.get_tools()
     
-    assert len(tool_list) == 10
+    assert len(tool_list) == 11
     
     # Check that expected tools are present
     tool_names = [tool.name for tool in tool_list]
@@ -29,7 +32,8 @@ def test_tools_creation(mock_starfish_client):
         "starfish_list_tagsets",
         "starfish_list_tags",
         "starfish_reset_rate_limit",
-        "starfish_get_rate_limit_status"
+        "starfish_get_rate_limit_status",
+        "starfish_batch"
     ]
     
     for expected_tool in expected_tools:
@@ -44,6 +48,18 @@ def test_tools_creation(mock_starfish_client):
         assert "properties" in tool.inputSchema
 
 
+def test_tools_list_built_once(mock_starfish_client):
+    """Test that get_tools reuses the tool objects built at construction."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    first = tools.get_tools()
+    second = tools.get_tools()
+    
+    assert first == second
+    assert first is not second  # callers get their own list
+    assert all(a is b for a, b in zip(first, second))
+
+
 def test_starfish_query_schema():
     """Test the comprehensive starfish_query schema."""
     schema = get_starfish_query_schema()
@@ -76,7 +92,7 @@ def test_starfish_query_schema():
         # Scope
         "volumes_and_paths", "zone",
         # Output
-        "limit", "sort_by", "format_fields", "use_async"
+        "limit", "sort_by", "format_fields", "pretty", "no_cache", "use_async"
     ]
     
     for param in expected_params:
@@ -102,10 +118,10 @@ class TestQueryBuilder:
         }
         
         query = build_starfish_query(args)
-        expected_parts = ["type=f", "name=config.json", "ext=json"]
+        expected_parts = {"type=f", "name=config.json", "ext=json"}
         
-        for part in expected_parts:
-            assert part in query
+        # Compare whole tokens so e.g. "name=x" can't match inside "iname=x"
+        assert expected_parts <= set(query.split())
     
     def test_size_and_nlinks_filters(self):
         """Test size and nlinks parameters."""
@@ -207,17 +223,16 @@ class TestQueryBuilder:
         }
         
         query = build_starfish_query(args)
-        expected_parts = [
+        expected_parts = {
             "type=f",
             "name=*.pdf", 
             "size=>1MB",
             "uid=1001",
             "mtime=-7d",
             "search-all"
-        ]
+        }
         
-        for part in expected_parts:
-            assert part in query
+        assert expected_parts <= set(query.split())
     
     def test_extract_query_metadata(self):
         """Test metadata extraction for results."""
@@ -234,7 +249,67 @@ class TestQueryBuilder:
         assert metadata["size"] == ">1MB"
         assert metadata["uid"] == 1001
         assert metadata["search_all"] is True
-        assert metadata["gid"] is None  # Not provided
+        assert "gid" not in metadata  # Not provided
+
+
+def test_starfish_query_schema_is_memoized():
+    """Test that the query schema is built once and reused."""
+    assert get_starfish_query_schema() is get_starfish_query_schema()
+
+
+def test_query_options_defaults_match_schema():
+    """Test that QueryOptions defaults come from the tool schema."""
+    properties = get_starfish_query_schema()["properties"]
+    options = QueryOptions.from_arguments({})
+    
+    assert options.volumes_and_paths == []
+    assert options.limit == properties["limit"]["default"]
+    assert options.use_async == properties["use_async"]["default"]
+    assert options.pretty == properties["pretty"]["default"]
+    assert options.no_cache == properties["no_cache"]["default"]
+    assert options.sort_by is None
+    assert options.format_fields is None
+
+
+def test_query_options_from_arguments():
+    """Test parsing execution options from tool arguments."""
+    options = QueryOptions.from_arguments({
+        "name": "*.pdf",
+        "volumes_and_paths": ["home:"],
+        "limit": 5,
+        "sort_by": "-size",
+        "format_fields": "fn size",
+        "use_async": True,
+        "pretty": True,
+        "no_cache": True
+    })
+    
+    assert options == QueryOptions(
+        volumes_and_paths=["home:"],
+        limit=5,
+        sort_by="-size",
+        format_fields="fn size",
+        use_async=True,
+        pretty=True,
+        no_cache=True
+    )
+
+
+def test_query_options_null_limit_uses_default():
+    """Test that an explicit null limit falls back to the schema default."""
+    assert QueryOptions.from_arguments({"limit": None}).limit == DEFAULT_LIMIT
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_reports_sync_for_unscoped_async(mock_starfish_client):
+    """Test that use_async reflects how an unscoped query actually ran."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_query", {"use_async": True, "limit": None})
+    data = json.loads(result["content"][0]["text"])
+    
+    assert data["use_async"] is False
+    assert data["limit"] == DEFAULT_LIMIT
 
 
 @pytest.mark.asyncio
@@ -262,14 +337,16 @@ async def test_starfish_query_tool(mock_starfish_client):
     assert "results" in data
     assert "total_found" in data
     
-    # Check that query was built correctly
-    query = data["query"]
-    assert "type=f" in query
-    assert "name=config.json" in query
-    assert "size=>1KB" in query
-    assert "uid=1001" in query
-    assert "mtime=-1d" in query
-    assert "search-all" in query
+    # Check that query was built correctly, token by token
+    tokens = set(data["query"].split())
+    assert {
+        "type=f",
+        "name=config.json",
+        "size=>1KB",
+        "uid=1001",
+        "mtime=-1d",
+        "search-all"
+    } <= tokens
     
     # Check filters_applied metadata
     filters = data["filters_applied"]
@@ -282,25 +359,260 @@ async def test_starfish_query_tool(mock_starfish_client):
 
 
 @pytest.mark.asyncio
-async def test_time_filter_combinations(mock_starfish_client):
-    """Test various time filter combinations."""
+async def test_starfish_query_result_times_are_iso(mock_starfish_client, sample_starfish_entries):
+    """Test that entry timestamps are rendered as ISO 8601 strings."""
+    from datetime import datetime
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_query", {"name": "foo"})
+    data = json.loads(result["content"][0]["text"])
+    
+    entry = data["results"][0]
+    raw = next(e for e in sample_starfish_entries if e["fn"] == entry["filename"])
+    assert entry["modify_time"] == datetime.fromtimestamp(raw["mt"]).isoformat()
+    assert entry["create_time"] == datetime.fromtimestamp(raw["ct"]).isoformat()
+    assert entry["access_time"] == datetime.fromtimestamp(raw["at"]).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_large_limit_uses_async(mock_starfish_client):
+    """Test that scoped queries above the threshold use the async query API."""
+    from starfish_mcp.tools.starfish_query import ASYNC_LIMIT_THRESHOLD
+    tools = StarfishTools(mock_starfish_client)
+    mock_starfish_client.async_query = AsyncMock(return_value=[])
+    
+    await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:"], "limit": ASYNC_LIMIT_THRESHOLD
+    })
+    assert mock_starfish_client.async_query.await_count == 0
+    
+    await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:"], "limit": ASYNC_LIMIT_THRESHOLD + 1
+    })
+    assert mock_starfish_client.async_query.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_multiple_scopes(mock_starfish_client, sample_starfish_entries):
+    """Test that a sync query over several scopes queries each one."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "limit": 100
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    scopes = [r["volumes_and_paths"] for r in mock_starfish_client.request_log if r["method"] == "query"]
+    assert sorted(scopes) == ["data:/projects", "home:"]
+    assert data["total_found"] == 2 * len(sample_starfish_entries)
+    
+    # The merged results are cut to the requested limit
+    result = await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "limit": 1
+    })
+    assert json.loads(result["content"][0]["text"])["total_found"] == 1
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_multiple_scopes_stops_at_limit(mock_starfish_client):
+    """Test that later scopes are cancelled once earlier ones fill the limit."""
     tools = StarfishTools(mock_starfish_client)
+    query = mock_starfish_client.query
+    cancelled = asyncio.Event()
+    
+    async def query_or_hang(**kwargs):
+        if kwargs["volumes_and_paths"] == "home:":
+            return await query(**kwargs)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    mock_starfish_client.query = query_or_hang
+    
+    result = await asyncio.wait_for(tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "limit": 2
+    }), timeout=5)
+    
+    assert json.loads(result["content"][0]["text"])["total_found"] == 2
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_multiple_scopes_sorted_awaits_every_scope(mock_starfish_client):
+    """Test that a sorted query waits for every scope even once limit is filled."""
+    tools = StarfishTools(mock_starfish_client)
+    query = mock_starfish_client.query
+    release = asyncio.Event()
+    finished = []
+    
+    async def query_slowly(**kwargs):
+        if kwargs["volumes_and_paths"] != "home:":
+            await release.wait()
+        finished.append(kwargs["volumes_and_paths"])
+        return await query(**kwargs)
+    
+    mock_starfish_client.query = query_slowly
+    
+    call = asyncio.ensure_future(tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "sort_by": "-size", "limit": 2
+    }))
+    await asyncio.sleep(0.05)
+    # The first scope alone fills limit, but the sorted merge still needs the second
+    assert finished == ["home:"]
+    assert not call.done()
+    
+    release.set()
+    result = await asyncio.wait_for(call, timeout=5)
+    
+    assert finished == ["home:", "data:/projects"]
+    assert json.loads(result["content"][0]["text"])["total_found"] == 2
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_multiple_scopes_merges_by_sort(mock_starfish_client, make_starfish_entries):
+    """Test that sorted multi-scope results are merged by the sort key before limit."""
+    from starfish_mcp.models import StarfishEntry
+    tools = StarfishTools(mock_starfish_client)
+    entries = [StarfishEntry(**entry) for entry in make_starfish_entries(8)]
+    # Each scope returns its own entries largest first; their sizes interleave
+    by_scope = {
+        "home:": sorted(entries[0::2], key=lambda e: -e.size),
+        "data:/projects": sorted(entries[1::2], key=lambda e: -e.size),
+    }
+    
+    async def query(**kwargs):
+        return by_scope[kwargs["volumes_and_paths"]]
     
-    test_cases = [
-        {"mtime": "-1d"},                    # Last day
-        {"ctime": "-2h"},                    # Last 2 hours
-        {"atime": "+30d"},                   # Older than 30 days
-        {"mtime": "2024-01-01"},            # Since specific date
-        {"mtime": "-1d", "atime": "+7d"},   # Combined filters
+    mock_starfish_client.query = query
+    
+    result = await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "sort_by": "-size", "limit": 4
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    assert [r["size"] for r in data["results"]] == [7 * 1024, 6 * 1024, 5 * 1024, 4 * 1024]
+    
+    # Several keys each keep their own direction
+    result = await tools.handle_tool_call("starfish_query", {
+        "volumes_and_paths": ["home:", "data:/projects"], "sort_by": "+parent_path,mtime",
+        "limit": 3
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    assert [r["filename"] for r in data["results"]] == ["file_7.txt", "file_6.txt", "file_5.txt"]
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_multiple_scopes_sort_keys(mock_starfish_client, make_starfish_entries):
+    """Test the multi-scope merge with aliased, extra, unknown and mixed-type keys."""
+    from starfish_mcp.models import StarfishEntry
+    tools = StarfishTools(mock_starfish_client)
+    raw = make_starfish_entries(4)
+    labels = [3, "b", None, 1]
+    entries = [
+        StarfishEntry(**entry, nlinks=4 - i, label=label)
+        for i, (entry, label) in enumerate(zip(raw, labels))
     ]
+    by_scope = {"home:": entries[:2], "data:/projects": entries[2:]}
     
-    for case in test_cases:
-        result = await tools.handle_tool_call("starfish_query", case)
-        data = json.loads(result["content"][0]["text"])
-        query = data["query"]
-        
-        for key, value in case.items():
-            assert f"{key}={value}" in query
+    async def query(**kwargs):
+        return by_scope[kwargs["volumes_and_paths"]]
+    
+    mock_starfish_client.query = query
+    
+    async def ids(sort_by):
+        result = await tools.handle_tool_call("starfish_query", {
+            "volumes_and_paths": ["home:", "data:/projects"], "sort_by": sort_by
+        })
+        return [r["id"] - 100000 for r in json.loads(result["content"][0]["text"])["results"]]
+    
+    # Field aliases and extra fields are sort keys too
+    assert await ids("-_id") == [3, 2, 1, 0]
+    assert await ids("nlinks") == [3, 2, 1, 0]
+    # A key no entry carries leaves the order to the other keys
+    assert await ids("no_such_field,-size") == [3, 2, 1, 0]
+    # Mixed types sort numbers before strings, with missing values last
+    assert await ids("label") == [3, 0, 1, 2]
+    assert await ids("-label") == [1, 0, 3, 2]
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_large_response(mock_starfish_client, make_starfish_entries):
+    """Test that a large response is formatted completely and in order."""
+    from starfish_mcp.models import StarfishEntry
+    tools = StarfishTools(mock_starfish_client)
+    entries = [StarfishEntry(**entry) for entry in make_starfish_entries(5000)]
+    mock_starfish_client.query = AsyncMock(return_value=entries)
+    
+    result = await tools.handle_tool_call("starfish_query", {"limit": 5000})
+    data = json.loads(result["content"][0]["text"])
+    
+    assert data["total_found"] == 5000
+    assert len(data["results"]) == 5000
+    assert data["results"][0]["filename"] == "file_0.txt"
+    assert data["results"][-1]["id"] == 104999
+    assert data["results"][-1]["tags"] == ["generated", "Collections:TestData"]
+    
+    # A response longer than limit is cut before formatting
+    result = await tools.handle_tool_call("starfish_query", {"limit": 1000})
+    data = json.loads(result["content"][0]["text"])
+    
+    assert data["total_found"] == 1000
+    assert data["results"][-1]["id"] == 100999
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_pretty_output(mock_starfish_client):
+    """Test that pretty=True indents the response without changing its content."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    compact = await tools.handle_tool_call("starfish_query", {"name": "foo"})
+    pretty = await tools.handle_tool_call("starfish_query", {"name": "foo", "pretty": True})
+    compact_text = compact["content"][0]["text"]
+    pretty_text = pretty["content"][0]["text"]
+    
+    assert "\n" not in compact_text
+    assert pretty_text.startswith('{\n  "query"')
+    assert json.loads(pretty_text) == json.loads(compact_text)
+    assert "pretty" not in json.loads(pretty_text)["filters_applied"]
+
+
+@pytest.mark.asyncio
+async def test_starfish_query_result_zones(mock_starfish_client, sample_starfish_entries):
+    """Test that entry zones are rendered with id, name and relative_path."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_query", {})
+    data = json.loads(result["content"][0]["text"])
+    
+    by_name = {entry["filename"]: entry for entry in data["results"]}
+    for raw in sample_starfish_entries:
+        if "zones" in raw:
+            assert by_name[raw["fn"]]["zones"] == raw["zones"]
+        else:
+            assert "zones" not in by_name[raw["fn"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", [
+    {"mtime": "-1d"},                    # Last day
+    {"ctime": "-2h"},                    # Last 2 hours
+    {"atime": "+30d"},                   # Older than 30 days
+    {"mtime": "2024-01-01"},            # Since specific date
+    {"mtime": "-1d", "atime": "+7d"},   # Combined filters
+])
+async def test_time_filter_combinations(mock_starfish_client, case):
+    """Test various time filter combinations."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_query", case)
+    data = json.loads(result["content"][0]["text"])
+    query = data["query"]
+    
+    for key, value in case.items():
+        assert f"{key}={value}" in query
 
 
 @pytest.mark.asyncio
@@ -323,23 +635,21 @@ async def test_case_insensitive_filters(mock_starfish_client):
 
 
 @pytest.mark.asyncio
-async def test_permission_filters(mock_starfish_client):
+@pytest.mark.parametrize("case", [
+    {"perm": "644"},        # Exact permissions
+    {"perm": "-u=r"},       # At least user read
+    {"perm": "/222"},       # Any write permission
+])
+async def test_permission_filters(mock_starfish_client, case):
     """Test permission filter parameters.""" 
     tools = StarfishTools(mock_starfish_client)
     
-    test_cases = [
-        {"perm": "644"},        # Exact permissions
-        {"perm": "-u=r"},       # At least user read
-        {"perm": "/222"},       # Any write permission
-    ]
+    result = await tools.handle_tool_call("starfish_query", case)
+    data = json.loads(result["content"][0]["text"])
+    query = data["query"]
     
-    for case in test_cases:
-        result = await tools.handle_tool_call("starfish_query", case)
-        data = json.loads(result["content"][0]["text"])
-        query = data["query"]
-        
-        for key, value in case.items():
-            assert f"{key}={value}" in query
+    for key, value in case.items():
+        assert f"{key}={value}" in query
 
 
 @pytest.mark.asyncio
@@ -379,6 +689,54 @@ async def test_list_volumes_tool(mock_starfish_client):
     assert isinstance(data["volumes"], list)
 
 
+@pytest.mark.asyncio
+async def test_management_output_is_compact_json(mock_starfish_client):
+    """Test that management tools emit compact (non-indented) JSON."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_list_volumes", {})
+    content = result["content"][0]["text"]
+    
+    assert "\n" not in content
+    assert json.loads(content)["total_volumes"] == 2
+
+
+@pytest.mark.asyncio
+async def test_list_volumes_and_zones_output_fields(mock_starfish_client):
+    """Test the field mapping of list_volumes and list_zones output."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_list_volumes", {})
+    volume = json.loads(result["content"][0]["text"])["volumes"][0]
+    assert volume == {
+        "id": 1,
+        "name": "storage1",
+        "display_name": "Primary Storage",
+        "root": "/mnt/storage1",
+        "type": "nfs",
+        "default_agent_address": "agent1.example.com",
+        "total_capacity": None,
+        "free_space": None,
+        "mounts": {
+            "agent1.example.com": "/mnt/storage1",
+            "agent2.example.com": "/mnt/storage1"
+        },
+        "mount_opts": {
+            "agent1.example.com": "rw,sync",
+            "agent2.example.com": "rw,sync"
+        }
+    }
+    
+    result = await tools.handle_tool_call("starfish_list_zones", {})
+    zone = json.loads(result["content"][0]["text"])["zones"][0]
+    assert zone["managers"] == [
+        {"system_id": 1000, "username": "alice"},
+        {"system_id": 1001, "username": "bob"}
+    ]
+    assert zone["restore_managers"] == ["alice", "bob"]
+    assert zone["aggregates"] == {"size": 1073741824, "dirs": 25, "files": 150, "cost": 53.69}
+
+
 @pytest.mark.asyncio
 async def test_list_zones_tool(mock_starfish_client):
     """Test list zones tool."""
@@ -395,6 +753,41 @@ async def test_list_zones_tool(mock_starfish_client):
     assert isinstance(data["zones"], list)
 
 
+@pytest.mark.asyncio
+async def test_get_zone_matches_list_zones(mock_starfish_client, sample_zones):
+    """Test that get_zone and list_zones render a zone identically."""
+    tools = StarfishTools(mock_starfish_client)
+    mock_starfish_client.get_zone = AsyncMock(return_value=sample_zones[0])
+    
+    listed = await tools.handle_tool_call("starfish_list_zones", {})
+    single = await tools.handle_tool_call("starfish_get_zone", {"zone_id": sample_zones[0]["id"]})
+    
+    listed_zone = json.loads(listed["content"][0]["text"])["zones"][0]
+    assert json.loads(single["content"][0]["text"]) == listed_zone
+
+
+@pytest.mark.asyncio
+async def test_get_zone_nested_fields(mock_starfish_client, sample_zones):
+    """Test get_zone with extra nested fields and with a payload that doesn't validate."""
+    tools = StarfishTools(mock_starfish_client)
+    zone = copy.deepcopy(sample_zones[0])
+    zone["managers"] = [{"system_id": 1000, "username": "alice", "email": "alice@example.com"}]
+    mock_starfish_client.get_zone = AsyncMock(return_value=zone)
+    
+    result = await tools.handle_tool_call("starfish_get_zone", {"zone_id": zone["id"]})
+    
+    # Extra nested fields are reduced to the model's fields
+    assert json.loads(result["content"][0]["text"])["managers"] == [
+        {"system_id": 1000, "username": "alice"}
+    ]
+    
+    # A manager without a username doesn't validate; the raw payload comes back
+    del zone["managers"][0]["username"]
+    result = await tools.handle_tool_call("starfish_get_zone", {"zone_id": zone["id"]})
+    
+    assert json.loads(result["content"][0]["text"]) == zone
+
+
 @pytest.mark.asyncio
 async def test_get_tagset_tool(mock_starfish_client):
     """Test get tagset tool."""
@@ -411,6 +804,115 @@ async def test_get_tagset_tool(mock_starfish_client):
     assert "name" in data
     assert "tags" in data
     assert isinstance(data["tags"], list)
+    assert isinstance(data["zones"], list)
+    assert list(data)[-1] == "zones"
+
+
+@pytest.mark.asyncio
+async def test_batch_tool(mock_starfish_client):
+    """Test running several tool calls through starfish_batch."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [
+            {"tool": "starfish_list_volumes"},
+            {"tool": "starfish_list_zones", "arguments": {}},
+            {"tool": "unknown_tool"}
+        ]
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    assert data["total_calls"] == 3
+    assert [r["tool"] for r in data["results"]] == [
+        "starfish_list_volumes", "starfish_list_zones", "unknown_tool"
+    ]
+    assert data["results"][0]["output"]["total_volumes"] == 2
+    assert data["results"][1]["output"]["total_zones"] == 2
+    assert "Unknown tool" in data["results"][2]["output"]
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_rate_limits_queries(mock_starfish_client):
+    """Test that batched starfish_query calls still count against the rate limit."""
+    from starfish_mcp.rate_limiter import RateLimiter
+    tools = StarfishTools(mock_starfish_client)
+    tools.rate_limiter = RateLimiter(max_queries=2, time_window_seconds=10, enabled=True)
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [{"tool": "starfish_query", "arguments": {"limit": 1}}] * 3,
+        "max_concurrent": 1
+    })
+    outputs = [r["output"] for r in json.loads(result["content"][0]["text"])["results"]]
+    
+    assert sum(isinstance(o, dict) for o in outputs) == 2
+    assert sum("RATE LIMIT EXCEEDED" in o for o in outputs if isinstance(o, str)) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_rejects_nesting(mock_starfish_client):
+    """Test that starfish_batch cannot call itself."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [{"tool": "starfish_batch", "arguments": {"calls": []}}]
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    assert "not supported" in data["results"][0]["output"]
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_reports_malformed_calls(mock_starfish_client):
+    """Test that malformed or failing calls get their own error entries."""
+    tools = StarfishTools(mock_starfish_client)
+    # A handler returning a malformed result makes that call raise inside the batch
+    tools._handlers["starfish_list_zones"] = AsyncMock(return_value={})
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [
+            "starfish_list_volumes",
+            {"tool": 42},
+            {"arguments": {}},
+            {"tool": "starfish_list_zones"},
+            {"tool": "starfish_list_volumes"}
+        ]
+    })
+    data = json.loads(result["content"][0]["text"])
+    outputs = [r["output"] for r in data["results"]]
+    
+    assert data["total_calls"] == 5
+    assert all("string 'tool' field" in o for o in outputs[:3])
+    assert "Tool execution failed" in outputs[3]
+    assert outputs[4]["total_volumes"] == 2
+
+
+@pytest.mark.parametrize("max_concurrent", [None, "2", 0, 1000])
+@pytest.mark.asyncio
+async def test_batch_tool_tolerates_max_concurrent(mock_starfish_client, max_concurrent):
+    """Test that odd max_concurrent values fall back or clamp instead of failing."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [{"tool": "starfish_list_volumes"}] * 2,
+        "max_concurrent": max_concurrent
+    })
+    data = json.loads(result["content"][0]["text"])
+    
+    assert data["total_calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_limits_call_count(mock_starfish_client):
+    """Test that starfish_batch refuses more calls than the schema allows."""
+    from starfish_mcp.tools.schema import BATCH_MAX_CALLS, BATCH_SCHEMA
+    tools = StarfishTools(mock_starfish_client)
+    
+    result = await tools.handle_tool_call("starfish_batch", {
+        "calls": [{"tool": "starfish_list_volumes"}] * (BATCH_MAX_CALLS + 1)
+    })
+    
+    assert "at most" in result["content"][0]["text"]
+    assert BATCH_SCHEMA["properties"]["calls"]["maxItems"] == BATCH_MAX_CALLS
 
 
 @pytest.mark.asyncio
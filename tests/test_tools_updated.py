@@ -218,6 +218,45 @@ async def test_starfish_list_tagsets(mock_starfish_client):
         assert "tag_count" in tagset
 
 
+@pytest.mark.asyncio
+async def test_starfish_list_tagsets_prefetch_details(mock_starfish_client):
+    """Test that prefetch_details folds each tagset's full tag list in."""
+    tools = StarfishTools(mock_starfish_client)
+    
+    mock_starfish_client.list_tagsets = AsyncMock(return_value=[
+        {"name": "beta", "tags": [{"id": 1, "name": "b1"}], "zones": []},
+        {"name": "alpha", "tags": [], "zones": []},
+        {"tags": [{"id": 2, "name": "n1"}], "zones": []}
+    ])
+    
+    async def get_tagset(name):
+        if name == "beta":
+            raise StarfishError("GET_TAGSET_FAILED", "Failed to get tagset")
+        return {"name": name, "tags": [{"id": i, "name": f"t{i}"} for i in range(7)]}
+    
+    mock_starfish_client.get_tagset = AsyncMock(side_effect=get_tagset)
+    
+    result = await tools.handle_tool_call("starfish_list_tagsets", {
+        "random_string": "test",
+        "prefetch_details": True
+    })
+    data = json.loads(result["content"][0]["text"])
+    nameless, alpha, beta = data["tagsets"]
+    
+    # The nameless tagset is not fetched, since "" means the default tagset
+    assert mock_starfish_client.get_tagset.await_count == 2
+    assert "" not in [c.args[0] for c in mock_starfish_client.get_tagset.await_args_list]
+    assert nameless["name"] is None
+    assert "tags" not in nameless and "details_error" not in nameless
+    assert nameless["sample_tags"] == ["n1"]
+    assert alpha["tag_count"] == 7
+    assert alpha["tags"] == [f"t{i}" for i in range(7)]
+    assert "sample_tags" not in alpha
+    # A failed fetch falls back to the listing data
+    assert beta["details_error"] == "[GET_TAGSET_FAILED] Failed to get tagset"
+    assert beta["sample_tags"] == ["b1"]
+
+
 @pytest.mark.asyncio
 async def test_starfish_get_tagset(mock_starfish_client):
     """Test getting specific tagset details.""" 